@@ -1,3 +1,4 @@
+import os
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 from crewai.agents.agent_builder.base_agent import BaseAgent
@@ -5,6 +6,9 @@ from crewai_tools import TavilySearchTool
 from typing import List
 from .tools import ProfileQueryTool, UniversityKnowledgeTool, ProfileChangesTool, ScholarshipMatcherTool, ScholarshipKnowledgeTool, ProfileRequestParsingTool, WebDataRetrievalTool, ApplicationDataExtractionTool, ProfileAccessTool, VisaScraperTool, AdmissionsDataTool, StageComputationTool, OpenAIWebSearchTool
 
+# Step-by-step console output is off unless CREW_VERBOSE=1 (it's synchronous stdout I/O on every step)
+CREW_VERBOSE = os.getenv("CREW_VERBOSE", "0") == "1"
+
 # If you want to run a snippet of code before or after the crew starts,
 # you can use the @before_kickoff and @after_kickoff decorators
 # https://docs.crewai.com/concepts/crews#example-crew-class-with-decorators
@@ -39,7 +43,7 @@ class SearchCrew():
                 UniversityKnowledgeTool(),    # Static university knowledge base
                 OpenAIWebSearchTool()        # OpenAI's built-in web search using Responses API
             ],
-            verbose=True,
+            verbose=CREW_VERBOSE,
             allow_delegation=False  # Specialist agent - cannot delegate to others
         )
 
@@ -68,7 +72,7 @@ class SearchCrew():
                     max_tokens=10000,
                 )
             ],
-            verbose=True,
+            verbose=CREW_VERBOSE,
             allow_delegation=False  # Specialist agent - cannot delegate to others
         )
 
@@ -96,7 +100,7 @@ class SearchCrew():
                 ),
                 VisaScraperTool(),
             ],
-            verbose=True,
+            verbose=CREW_VERBOSE,
             allow_delegation=False  # Specialist agent - cannot delegate to others
         )
         
@@ -121,7 +125,7 @@ class SearchCrew():
                 WebDataRetrievalTool(),               # Uses Tavily search to find and retrieve content from university websites
                 ApplicationDataExtractionTool()        # Extracts structured data using OpenAI
             ],
-            verbose=True,
+            verbose=CREW_VERBOSE,
             allow_delegation=False  # Specialist agent - cannot delegate to others
         )
     
@@ -152,7 +156,7 @@ class SearchCrew():
         return Agent(
             config=config,
             tools=[],  # Manager doesn't use tools in hierarchical mode
-            verbose=True,
+            verbose=CREW_VERBOSE,
             allow_delegation=True,  # CRITICAL: Manager MUST delegate in hierarchical mode
             max_iter=5,  # Allow multiple delegation attempts if needed
             memory=False  # Disable memory to avoid state issues
@@ -174,7 +178,7 @@ class SearchCrew():
                 ProfileQueryTool(),
                 ProfileAccessTool(),
             ],
-            verbose=True,
+            verbose=CREW_VERBOSE,
             allow_delegation=False
         )
 
@@ -199,7 +203,7 @@ class SearchCrew():
                 "Each object in the array must have: action, priority, due_date, related_agent, and reasoning fields."
             ),
             tools=[AdmissionsDataTool(), ProfileQueryTool(), StageComputationTool()],
-            verbose=True,
+            verbose=CREW_VERBOSE,
             allow_delegation=False  # Specialist agent - generates steps, doesn't delegate
         )
 
@@ -299,7 +303,7 @@ class SearchCrew():
             agents=self.agents, # Automatically created by the @agent decorator
             tasks=self.tasks, # Automatically created by the @task decorator
             process=Process.sequential,
-            verbose=True,
+            verbose=CREW_VERBOSE,
         )
 
 class ManagerCrew():
@@ -323,7 +327,7 @@ class ManagerCrew():
             goal="Aggregate admissions data (universities, scholarships, requirements, visas) for synthesis by using the Admissions Data Aggregation Tool.",
             backstory="A focused data specialist that reads and summarizes cross-agent data for the manager. When asked to aggregate data, you MUST use the Admissions Data Aggregation Tool with the provided user_id to get comprehensive admissions data including counts, missing agents, deadlines, and profile information. Always return the data as JSON format.",
             tools=[AdmissionsDataTool()],
-            verbose=True,
+            verbose=CREW_VERBOSE,
             allow_delegation=False
         )
 
@@ -333,7 +337,7 @@ class ManagerCrew():
             goal="Determine the current stage of a student's admissions journey by using the Stage Computation Tool.",
             backstory="A specialist that analyzes user progress and determines which stage of the admissions journey they are in. When asked to compute the stage, you MUST use the Stage Computation Tool with the provided user_id to determine the current stage. Always return the stage information as JSON format with current_stage, stage_number, stage_description, and reasoning fields.",
             tools=[StageComputationTool()],
-            verbose=True,
+            verbose=CREW_VERBOSE,
             allow_delegation=False
         )
 
@@ -348,7 +352,7 @@ class ManagerCrew():
                 UniversityKnowledgeTool(),
                 OpenAIWebSearchTool()
             ],
-            verbose=True,
+            verbose=CREW_VERBOSE,
             allow_delegation=False
         )
 
@@ -371,7 +375,7 @@ class ManagerCrew():
                     include_domains=["fastweb.com", "scholarships.com", "collegeboard.org", "cappex.com", "niche.com", "petersons.com"]
                 )
             ],
-            verbose=True,
+            verbose=CREW_VERBOSE,
             allow_delegation=False
         )
 
@@ -392,7 +396,7 @@ class ManagerCrew():
                 ),
                 VisaScraperTool(),
             ],
-            verbose=True,
+            verbose=CREW_VERBOSE,
             allow_delegation=False
         )
 
@@ -407,7 +411,7 @@ class ManagerCrew():
                 WebDataRetrievalTool(),
                 ApplicationDataExtractionTool()
             ],
-            verbose=True,
+            verbose=CREW_VERBOSE,
             allow_delegation=False
         )
 
@@ -416,7 +420,7 @@ class ManagerCrew():
             role="Admissions Counselor Agent",
             goal="Guide students through their complete admissions journey with strategic coordination.",
             backstory="Master strategic advisor synthesizing all agent outputs to provide holistic guidance.",
-            verbose=True,
+            verbose=CREW_VERBOSE,
             allow_delegation=True,
 
         )
@@ -513,7 +517,7 @@ class ManagerCrew():
                 "Each object in the array must have: action, priority, due_date, related_agent, and reasoning fields."
             ),
             tools=[AdmissionsDataTool(), ProfileQueryTool()],  # Access to data for generating informed next steps
-            verbose=True,
+            verbose=CREW_VERBOSE,
             allow_delegation=False  # Specialist agent - generates steps, doesn't delegate
         )
 
@@ -528,7 +532,7 @@ class ManagerCrew():
                 "Always return plain text without markdown and avoid reiterating detailed task lists."
             ),
             tools=[AdmissionsDataTool(), ProfileQueryTool(), StageComputationTool()],
-            verbose=True,
+            verbose=CREW_VERBOSE,
             allow_delegation=False
         )
 
@@ -547,7 +551,7 @@ class ManagerCrew():
             tasks=[manager_task],
             manager_agent=manager,
             process=Process.hierarchical,
-            verbose=True,
+            verbose=CREW_VERBOSE,
         )
 
 if __name__ == "__main__":
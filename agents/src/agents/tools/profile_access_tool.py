@@ -9,10 +9,15 @@ import json
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', '..', '..', 'app'))
 
 try:
-    from supabase_client import get_supabase
+    # Prefer the app package so tools running inside the API share its client
+    # (importing the bare module name would load a second copy with its own client)
+    from app.supabase_client import get_supabase
 except ImportError:
-    print("Warning: Could not import supabase_client. Make sure the app module is in the Python path.")
-    get_supabase = None
+    try:
+        from supabase_client import get_supabase
+    except ImportError:
+        print("Warning: Could not import supabase_client. Make sure the app module is in the Python path.")
+        get_supabase = None
 
 
 class ProfileAccessInput(BaseModel):
@@ -47,11 +52,11 @@ class ProfileAccessTool(BaseTool):
 
         try:
             supabase = get_supabase()
-            resp = supabase.table('user_profile').select('*').eq('id', user_id).limit(1).execute()
-            if not resp.data:
+            resp = supabase.table('user_profile').select('*').eq('id', user_id).maybe_single().execute()
+            if not resp:
                 return json.dumps({"error": f"No user profile found with ID: {user_id}"})
 
-            profile: Dict[str, Any] = resp.data[0]
+            profile: Dict[str, Any] = resp.data
 
             # Attempt multiple keys/locations for robustness
             preferences = profile.get('preferences') or {}
@@ -8,10 +8,15 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', '..', '..', 'app'))
 
 try:
-    from supabase_client import get_supabase
+    # Prefer the app package so tools running inside the API share its client
+    # (importing the bare module name would load a second copy with its own client)
+    from app.supabase_client import get_supabase
 except ImportError:
-    print("Warning: Could not import supabase_client. Make sure the app module is in the Python path.")
-    get_supabase = None
+    try:
+        from supabase_client import get_supabase
+    except ImportError:
+        print("Warning: Could not import supabase_client. Make sure the app module is in the Python path.")
+        get_supabase = None
 
 
 class ProfileQueryInput(BaseModel):
@@ -3,10 +3,39 @@ from flask_cors import CORS
 from .routes import register_routes
 from .event_listener import start_profile_listener, stop_profile_listener
 import atexit
+import logging
+import logging.handlers
 import os
+import queue
+
+_log_listener = None
+
+
+def _configure_logging() -> None:
+	"""
+	Route app.* loggers through a QueueHandler so request threads only
+	enqueue records; a background QueueListener does the stdout writes.
+	Level comes from LOG_LEVEL (default INFO).
+	"""
+	global _log_listener
+	if _log_listener is not None:
+		return
+
+	log_queue = queue.SimpleQueue()
+	stream_handler = logging.StreamHandler()
+	stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+	_log_listener = logging.handlers.QueueListener(log_queue, stream_handler)
+	_log_listener.start()
+	atexit.register(_log_listener.stop)
+
+	app_logger = logging.getLogger(__name__)
+	app_logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+	app_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+	app_logger.propagate = False
 
 
 def create_app() -> Flask:
+	_configure_logging()
 	frontend_path = os.path.join(os.path.dirname(__file__), "static-frontend")
 	app = Flask(__name__, static_folder=frontend_path, static_url_path="/static-frontend")
 	CORS(app, resources={r"/*": {
@@ -16,7 +45,7 @@ def create_app() -> Flask:
 			"https://dashboard.pgadmit.com"
 		],
 		"methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-		"allow_headers": ["Content-Type", "Authorization"]
+		"allow_headers": ["Content-Type", "Authorization", "Idempotency-Key"]
 	}})
 	register_routes(app)
 	
@@ -276,16 +276,16 @@ class AgentEventHandler:
             # Get existing stress flags
             summary_resp = self.supabase.table("admissions_summary").select(
                 "id, stress_flags"
-            ).eq("user_id", user_id).order("last_updated", desc=True).limit(1).execute()
+            ).eq("user_id", user_id).order("last_updated", desc=True).limit(1).maybe_single().execute()
             
-            if summary_resp.data:
-                existing_flags = summary_resp.data[0].get("stress_flags", {})
+            if summary_resp:
+                existing_flags = summary_resp.data.get("stress_flags", {})
                 existing_flags.update(flags)
                 
                 self.supabase.table("admissions_summary").update({
                     "stress_flags": existing_flags,
                     "last_updated": datetime.now().isoformat()
-                }).eq("id", summary_resp.data[0]["id"]).execute()
+                }).eq("id", summary_resp.data["id"]).execute()
         except Exception as e:
             print(f"Error updating stress flags: {e}")
     
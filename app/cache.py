@@ -0,0 +1,69 @@
+"""
+In-Process Caching
+
+Small thread-safe TTL cache for slowly-changing lookups (user existence,
+token balances, scholarship result views, application requirements) so
+repeated requests skip a Supabase round-trip.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Bounded mapping whose entries expire ``ttl`` seconds after being set.
+    When full, the least recently used entry is evicted.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+            return default if entry is _MISSING else entry[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+# Shared caches
+user_exists_cache = TTLCache(maxsize=10_000, ttl=300)
+token_balance_cache = TTLCache(maxsize=10_000, ttl=5)
+# user_profile_id -> {(active_only, category, limit): response body}
+scholarship_results_cache = TTLCache(maxsize=2048, ttl=30)
+# str(user_profile_id) -> {(university, program): application_requirements row}
+application_requirements_cache = TTLCache(maxsize=4096, ttl=300)
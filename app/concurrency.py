@@ -0,0 +1,111 @@
+"""
+Concurrency Helpers
+
+Shared thread pool for overlapping independent, network-bound calls
+(e.g. Supabase queries) inside a single request, a separate pool for
+long-running background jobs such as agent runs, and bounded queues
+drained by single workers for fire-and-forget logging and outbound
+webhooks.
+"""
+
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List
+
+
+logger = logging.getLogger(__name__)
+
+
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("IO_POOL_WORKERS", "8")),
+    thread_name_prefix="io-pool"
+)
+
+# Kept apart from the I/O pool so minutes-long agent runs can't starve short queries
+_job_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("JOB_POOL_WORKERS", "2")),
+    thread_name_prefix="job-pool"
+)
+
+
+class _BoundedWorker:
+    """
+    Single daemon thread draining a bounded task queue. Fire-and-forget work
+    (logging, webhooks) goes here so it never queues ahead of request-path
+    queries on the I/O pool; when the queue is full, tasks are dropped.
+    """
+
+    def __init__(self, name: str, maxsize: int):
+        self.name = name
+        self.queue: "queue.Queue[tuple]" = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+        threading.Thread(target=self._drain, name=name, daemon=True).start()
+
+    def _drain(self) -> None:
+        while True:
+            fn, args, kwargs = self.queue.get()
+            try:
+                fn(*args, **kwargs)
+            except Exception:
+                logger.exception("Background task on %s failed", self.name)
+            finally:
+                self.queue.task_done()
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> bool:
+        try:
+            self.queue.put_nowait((fn, args, kwargs))
+            return True
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+                dropped = self.dropped
+            logger.warning("%s queue full, dropped a background task (%d dropped so far)", self.name, dropped)
+            return False
+
+
+_log_worker = _BoundedWorker("log-worker", int(os.getenv("LOG_QUEUE_SIZE", "1000")))
+_webhook_worker = _BoundedWorker("webhook-worker", int(os.getenv("WEBHOOK_QUEUE_SIZE", "100")))
+
+
+def run_in_parallel(*calls: Callable[[], Any]) -> List[Any]:
+    """
+    Run zero-argument callables concurrently and return their results in order.
+    Re-raises the first exception encountered (in argument order).
+    """
+    futures = [_executor.submit(call) for call in calls]
+    return [future.result() for future in futures]
+
+
+def submit_background(fn: Callable[..., Any], *args, **kwargs):
+    """Schedule work on the shared pool without waiting for the result."""
+    return _executor.submit(fn, *args, **kwargs)
+
+
+def submit_job(fn: Callable[..., Any], *args, **kwargs):
+    """Schedule a long-running background job (e.g. a crew kickoff)."""
+    return _job_executor.submit(fn, *args, **kwargs)
+
+
+def submit_log(fn: Callable[..., Any], *args, **kwargs) -> bool:
+    """
+    Queue fire-and-forget logging work for the dedicated log worker.
+    Returns False (and counts the drop) if the queue is full.
+    """
+    return _log_worker.submit(fn, *args, **kwargs)
+
+
+def dropped_log_count() -> int:
+    """Number of logging tasks dropped because the queue was full."""
+    return _log_worker.dropped
+
+
+def submit_webhook(fn: Callable[..., Any], *args, **kwargs) -> bool:
+    """
+    Queue an outbound webhook call for the dedicated webhook worker.
+    Returns False (and counts the drop) if the queue is full.
+    """
+    return _webhook_worker.submit(fn, *args, **kwargs)
@@ -6,6 +6,7 @@ when significant profile updates occur.
 """
 
 import time
+import logging
 import requests
 import threading
 from datetime import datetime, timezone, timedelta
@@ -13,6 +14,8 @@ from typing import List, Dict, Any, Optional
 from .supabase_client import get_supabase
 import os
 
+logger = logging.getLogger(__name__)
+
 
 class ProfileChangeListener:
     """
@@ -28,6 +31,8 @@ class ProfileChangeListener:
         """
         self.polling_interval = polling_interval
         self.api_base_url = f"http://localhost:{os.getenv('PORT', '5000')}"
+        # Reuse one keep-alive connection for the API calls we trigger
+        self.session = requests.Session()
         self.is_running = False
         self.last_check_time = None
         self.thread = None
@@ -174,9 +179,7 @@ class ProfileChangeListener:
                 self.last_check_time = new_last_check
             
         except Exception as e:
-            print(f"Error checking changes: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error checking profile changes: %s", e)
     
     def _trigger_scholarship_update(self, user_id: int, changed_fields: List[str], change_id: int) -> None:
         """Trigger delta scholarship search via API."""
@@ -209,7 +212,7 @@ class ProfileChangeListener:
             print(f"   URL: {url}")
             print(f"   Payload: {payload}")
             
-            response = requests.post(url, json=payload, timeout=180)  # 3 minutes for complex AI operations
+            response = self.session.post(url, json=payload, timeout=180)  # 3 minutes for complex AI operations
             
             if response.status_code == 200:
                 print(f"✅ SUCCESS: Delta scholarship search completed for user {user_id}")
@@ -230,11 +233,9 @@ class ProfileChangeListener:
                 self.processed_change_ids.discard(change_id)
                 
         except Exception as e:
-            print(f"💥 ERROR triggering delta search for user {user_id}: {str(e)}")
+            logger.exception("Error triggering delta search for user %s: %s", user_id, e)
             # Remove from processed set if there was an error to allow retry
             self.processed_change_ids.discard(change_id)
-            import traceback
-            traceback.print_exc()
 
 
 # Global listener instance
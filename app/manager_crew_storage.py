@@ -8,6 +8,14 @@ from datetime import datetime
 from .supabase_client import get_supabase
 from .checklist_formatter import to_json_with_labels, to_markdown
 from .utils import _detect_visa_changes
+from .agent_event_handler import get_event_handler
+from .cache import application_requirements_cache
+
+# Patterns for pulling JSON out of agent output, compiled once
+_APP_REQ_OBJECT_RE = re.compile(r'\{[\s\S]*"university_name"[\s\S]*"program_name"[\s\S]*\}')
+_JSON_OBJECT_RE = re.compile(r'\{[\s\S]*\}')
+# Matches a comma before a closing } or ] (covers both trailing-comma cases in one pass)
+_TRAILING_COMMA_RE = re.compile(r',(\s*[\]}])')
 
 
 def store_application_requirement_results(user_id: int, agent_output: str) -> dict:
@@ -30,19 +38,17 @@ def store_application_requirement_results(user_id: int, agent_output: str) -> di
         
         # Look for JSON objects in the output
         # Try to find structured JSON first
-        json_match = re.search(r'\{[\s\S]*"university_name"[\s\S]*"program_name"[\s\S]*\}', cleaned_output)
+        json_match = _APP_REQ_OBJECT_RE.search(cleaned_output)
         if not json_match:
             # Try to find any JSON object
-            json_match = re.search(r'\{[\s\S]*\}', cleaned_output)
+            json_match = _JSON_OBJECT_RE.search(cleaned_output)
         
         if json_match:
             try:
                 json_text = json_match.group(0)
                 # Clean up JSON text
                 normalized_json = json_text.strip()
-                normalized_json = re.sub(r',(\s*[\]}])', r'\1', normalized_json)
-                normalized_json = re.sub(r',\s*}', '}', normalized_json)
-                normalized_json = re.sub(r',\s*]', ']', normalized_json)
+                normalized_json = _TRAILING_COMMA_RE.sub(r'\1', normalized_json)
                 
                 data = json.loads(normalized_json)
                 
@@ -91,13 +97,15 @@ def store_application_requirement_results(user_id: int, agent_output: str) -> di
                     
                     stored_count += 1
                     
+                # Cached GET responses for this user may now be outdated
+                application_requirements_cache.pop(str(user_id))
+                    
             except (json.JSONDecodeError, Exception) as e:
                 print(f"[ERROR] Failed to parse Application Requirement Agent output: {e}")
                 return {"stored_count": 0, "status": "error", "error": str(e)}
         
         # Log agent report
         try:
-            from .agent_event_handler import get_event_handler
             get_event_handler().log_agent_report(
                 agent_name="Application Requirement Agent",
                 user_id=user_id,
@@ -133,14 +141,14 @@ def store_visa_information_results(user_id: int, agent_output: str) -> dict:
         stored_count = 0
         
         # Get user profile to extract citizenship and destination
-        profile_resp = supabase.table("user_profile").select("citizenship_country, destination_country").eq("id", user_id).execute()
+        profile_resp = supabase.table("user_profile").select("citizenship_country, destination_country").eq("id", user_id).maybe_single().execute()
         
         citizenship = None
         destination = None
         
-        if profile_resp.data:
-            citizenship = profile_resp.data[0].get("citizenship_country")
-            destination = profile_resp.data[0].get("destination_country")
+        if profile_resp:
+            citizenship = profile_resp.data.get("citizenship_country")
+            destination = profile_resp.data.get("destination_country")
         
         # If citizenship/destination not in profile, try to extract from output or use defaults
         if not citizenship or not destination:
@@ -231,7 +239,6 @@ def store_visa_information_results(user_id: int, agent_output: str) -> dict:
         
         # Log agent report
         try:
-            from .agent_event_handler import get_event_handler
             get_event_handler().log_agent_report(
                 agent_name="Visa Information Agent",
                 user_id=user_id,
@@ -321,7 +328,6 @@ def store_university_search_results(user_id: int, agent_output: str) -> dict:
         
         # Log agent report
         try:
-            from .agent_event_handler import get_event_handler
             get_event_handler().log_agent_report(
                 agent_name="University Search Agent",
                 user_id=user_id,
@@ -383,7 +389,6 @@ def store_scholarship_search_results(user_id: int, agent_output: str) -> dict:
         
         # Log agent report
         try:
-            from .agent_event_handler import get_event_handler
             get_event_handler().log_agent_report(
                 agent_name="Scholarship Search Agent",
                 user_id=user_id,
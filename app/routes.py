@@ -1,39 +1,233 @@
-from flask import Flask, request, jsonify, g
+from flask import Flask, Response, current_app, request, jsonify, g, send_from_directory
 from http import HTTPStatus
+import hashlib
 import json
+import logging
 import sys
 import os
 import re
-from datetime import datetime, timedelta
+import traceback
+import uuid
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
+from typing import Callable
+from postgrest.exceptions import APIError
 from .supabase_client import get_supabase
-from .utils import _generate_visa_report, _generate_html_report, _detect_visa_changes
+from .utils import _generate_visa_report, _generate_html_report, _detect_visa_changes, _fetch_latest_visa_row, _extract_json, _json_decoder
 from .auth import require_auth, optional_auth
+from .cache import (
+	TTLCache, user_exists_cache, token_balance_cache, scholarship_results_cache,
+	application_requirements_cache
+)
+from .concurrency import run_in_parallel, submit_job, submit_log, submit_webhook
+from .token_tracker import get_user_token_balance, add_tokens_to_user
+from .agent_event_handler import get_event_handler
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+	import orjson
+except ImportError:  # optional speedup; fall back to the stdlib
+	orjson = None
 
 from app.checklist_formatter import to_json_with_labels, to_markdown
 
+logger = logging.getLogger(__name__)
+
 # Add agents module to path
 agents_path = os.path.join(os.path.dirname(__file__), '..', 'agents', 'src')
 sys.path.append(os.path.abspath(agents_path))
 
+# Agent crews are imported once at startup. Handlers look classes up on the
+# module at call time (agent_crews.SearchCrew) so they stay patchable.
+try:
+	from agents import crew as agent_crews
+	from crewai import Crew, Process
+except ImportError as exc:
+	logger.warning("Agent crews unavailable: %s", exc)
+	agent_crews = None
+	Crew = Process = None
+
+
+def _agent_crews():
+	"""Return the agents.crew module, raising ImportError if it failed to load at startup."""
+	if agent_crews is None:
+		raise ImportError("agents.crew could not be imported")
+	return agent_crews
+
+# Crew step logging is synchronous stdout I/O; only enable it when debugging
+_CREW_VERBOSE = os.getenv("CREW_VERBOSE", "0") == "1"
+
+# Optional outbound target for /counselor_notifications (.env is loaded by supabase_client on import)
+_COUNSELOR_WEBHOOK_URL = os.getenv("COUNSELOR_WEBHOOK_URL")
+# Shared keep-alive session so repeat dispatches reuse an open connection. Retries
+# only cover connection failures - a POST the receiver may have seen isn't resent.
+_webhook_session = requests.Session()
+_webhook_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=Retry(total=2, backoff_factor=0.2))
+_webhook_session.mount("https://", _webhook_adapter)
+_webhook_session.mount("http://", _webhook_adapter)
+
+# In-process registry of background university searches, keyed by search_id
+_search_jobs = TTLCache(maxsize=1000, ttl=3600)
+# In-process registry of other background agent runs (see _start_agent_job), keyed by job_id
+_agent_jobs = TTLCache(maxsize=1000, ttl=3600)
+
+# Explicit column lists for rows returned to clients, so new (possibly large)
+# columns aren't shipped over PostgREST unless a handler asks for them
+_APPLICATION_REQUIREMENT_COLUMNS = (
+	"id, user_profile_id, university, program, application_platform, deadlines, "
+	"required_documents, essay_prompts, portfolio_required, interview, fee_info, "
+	"test_policy, source_url, fetched_at, is_ambiguous, reviewed_by"
+)
+_ADMISSIONS_SUMMARY_COLUMNS = (
+	"id, user_id, current_stage, progress_score, active_agents, stress_flags, "
+	"next_steps, advice, last_updated"
+)
+
+# (column, default) pairs copied from agent output into application_requirements rows;
+# user_profile_id and fetched_at are set by the caller. Defaults are shared, never mutated.
+_REQ_FIELDS = (
+	("university", None),
+	("program", None),
+	("application_platform", None),
+	("deadlines", {}),
+	("required_documents", []),
+	("essay_prompts", {}),
+	("portfolio_required", False),
+	("interview", None),
+	("fee_info", {}),
+	("test_policy", None),
+	("source_url", None),
+	("is_ambiguous", False),
+	("reviewed_by", None),
+)
+
+# Patterns for pulling JSON out of agent output, compiled once
+_JSON_OBJECT_RE = re.compile(r'\{[\s\S]*\}')
+# Matches a comma before a closing } or ] (covers both trailing-comma cases in one pass)
+_TRAILING_COMMA_RE = re.compile(r',(\s*[\]}])')
+
+# Lower bounds (days until deadline) of the urgent / upcoming / future scholarship buckets
+_DEADLINE_BUCKET_EDGES = (0, 31, 91)
+
+# Static responses, serialized once at import
+_API_INDEX_BODY = json.dumps({
+	"message": "Welcome to PG Admit - AI AGENTS",
+	"version": "1.0.0",
+	"endpoints": {
+		"health": "/health",
+		"get_profile": "/profile/<user_profile_id>",
+		"create_profile": "/profile",
+		"update_profile": "/profile/<user_profile_id>",
+		"delete_profile": "/profile/<user_profile_id>",
+		"get_token_balance": "/tokens/balance/<user_profile_id>",
+		"add_tokens": "/tokens/add/<user_profile_id>",
+		"search_universities": "/search_universities",
+		"get_university_search_status": "/search_universities/<search_id>",
+		"search_scholarships": "/search_scholarships",
+		"get_university_results": "/results/<user_profile_id>",
+		"get_scholarship_results": "/results/scholarships/<user_profile_id>",
+		"fetch_application_requirements": "/fetch_application_requirements",
+		"get_application_requirements": "/application_requirements/<university>/<program>",
+		"visa_info": "/visa_info",
+		"get_visa_info": "/visa_info/<citizenship>/<destination>",
+		"visa_report": "/visa_report/<citizenship>/<destination>",
+		"get_visa_alerts": "/visa_alerts",
+		"mark_visa_alerts_sent": "/visa_alerts/mark_sent",
+		"admissions_summary": "/admissions/summary/<user_id>",
+		"admissions_next_steps": "/admissions/next_steps/<user_id>",
+		"update_admissions_stage": "/admissions/update_stage",
+		"log_agent_report": "/admissions/log_agent_report",
+		"get_job_status": "/jobs/<job_id>"
+	}
+}).encode()
+_API_INDEX_ETAG = hashlib.sha1(_API_INDEX_BODY).hexdigest()
+_HEALTH_BODY = json.dumps({
+	"status": "healthy",
+	"message": "PG Admit API is running"
+}).encode()
+
+def _json_response(data, status: HTTPStatus = HTTPStatus.OK, pretty: bool = True, default=None) -> Response:
+	"""
+	Serialize a response body with orjson when available (non-ASCII kept).
+	Pretty-printed by default; pass pretty=False for compact output on large payloads.
+	`default` converts otherwise unserializable values (e.g. default=str).
+	"""
+	if orjson is not None:
+		option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+		body = orjson.dumps(data, default=default, option=option)
+	else:
+		body = json.dumps(data, indent=2 if pretty else None, ensure_ascii=False, default=default)
+	return Response(body, status=status, mimetype="application/json")
+
+def _loads_if_json(text: str):
+	"""
+	Parse text that is a single well-formed JSON document, else return None.
+	Agent output is usually clean JSON, so callers try this before any
+	extraction or cleanup scan.
+	"""
+	try:
+		return orjson.loads(text) if orjson is not None else json.loads(text)
+	except ValueError:
+		return None
+
+def _parse_body() -> dict:
+	"""
+	Decode the JSON request body straight from the raw bytes (orjson when
+	available). Like get_json(silent=True) or {}, returns {} for non-JSON,
+	empty or malformed bodies, and also when the body isn't an object.
+	"""
+	if not request.is_json:
+		return {}
+	raw = request.get_data(cache=False)
+	if not raw:
+		return {}
+	try:
+		data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+	except ValueError:  # JSONDecodeError (both libraries) and UnicodeDecodeError
+		return {}
+	return data if isinstance(data, dict) else {}
+
+def _get_user_profile(user_profile_id: int) -> dict | None:
+	"""
+	Fetch the full user_profile row, memoized on flask.g for the current request
+	so handlers that need the profile snapshot share one round trip.
+	Returns None if the profile doesn't exist.
+	"""
+	cache = g.setdefault("user_profile_cache", {})
+	if user_profile_id not in cache:
+		supabase = get_supabase()
+		profile_resp = supabase.table("user_profile").select("*").eq("id", user_profile_id).maybe_single().execute()
+		cache[user_profile_id] = profile_resp.data if profile_resp else None
+	return cache[user_profile_id]
+
+def _user_not_found_error(user_profile_id) -> dict:
+	"""Error body returned when a user_profile_id doesn't exist."""
+	return {
+		"error": f"User profile {user_profile_id} not found",
+		"user_profile_id": user_profile_id,
+		"suggestion": "Please verify the user_profile_id exists in the database"
+	}
+
 def _validate_user_exists(user_profile_id: int) -> tuple[bool, dict]:
 	"""
 	Validate if a user profile exists in the database.
 	Returns (exists, response_data) where response_data is None if user exists,
 	or error response dict if user doesn't exist.
 	"""
+	if user_exists_cache.get(user_profile_id):
+		return True, None
 	try:
-		supabase = get_supabase()
-		profile_resp = supabase.table("user_profile").select("id").eq("id", user_profile_id).execute()
-		
-		if not profile_resp.data:
-			return False, {
-				"error": f"User profile {user_profile_id} not found",
-				"user_profile_id": user_profile_id,
-				"suggestion": "Please verify the user_profile_id exists in the database"
-			}
+		# Reuse a profile this request already fetched; otherwise only ask for the id
+		if not g.get("user_profile_cache", {}).get(user_profile_id):
+			supabase = get_supabase()
+			exists_resp = supabase.table("user_profile").select("id").eq("id", user_profile_id).maybe_single().execute()
+			if not exists_resp:
+				return False, _user_not_found_error(user_profile_id)
 		
+		user_exists_cache.set(user_profile_id, True)
 		return True, None
 	except Exception as exc:
 		return False, {
@@ -41,44 +235,720 @@ def _validate_user_exists(user_profile_id: int) -> tuple[bool, dict]:
 			"user_profile_id": user_profile_id
 		}
 
+def _begin_university_search(user_profile_id: int, payload: dict) -> dict | None:
+	"""
+	Log a search_requests row with a snapshot of the user's profile.
+
+	Uses the begin_university_search RPC so the profile read and the insert
+	happen in one round-trip (and one transaction). Falls back to direct
+	table queries if the function has not been deployed yet.
+	Returns {"search_id", "profile"} (search_id is None if the insert
+	failed), or None if the user profile doesn't exist.
+	"""
+	supabase = get_supabase()
+	try:
+		search = supabase.rpc("begin_university_search", {
+			"p_user_profile_id": user_profile_id,
+			"p_payload": payload
+		}).execute().data
+		if search:
+			g.setdefault("user_profile_cache", {})[user_profile_id] = search["profile"]
+		return search or None
+	except APIError as rpc_error:
+		logger.warning("begin_university_search RPC failed, using direct queries: %s", rpc_error)
+
+	profile = _get_user_profile(user_profile_id)
+	if not profile:
+		return None
+	
+	now_iso = datetime.now().isoformat()
+	profile_snapshot = {
+		"timestamp": now_iso,
+		"profile": profile
+	}
+	
+	search_payload = {
+		**payload,
+		"profile_snapshot": profile_snapshot,
+		"request_timestamp": now_iso
+	}
+	
+	search_result = supabase.table("search_requests").insert({
+		"user_profile_id": user_profile_id,
+		"request_payload": search_payload,
+	}).execute()
+	
+	return {
+		"search_id": search_result.data[0]["id"] if search_result.data else None,
+		"profile": profile
+	}
+
+def _run_university_search(user_profile_id: int, search_id: int, payload: dict) -> tuple[dict, HTTPStatus]:
+	"""
+	Run the university search crew for a logged search request and store
+	its results. Returns (response_body, status) so it can back both the
+	synchronous endpoint and background jobs.
+	"""
+	supabase = get_supabase()
+	try:
+		SearchCrew = _agent_crews().SearchCrew
+		# Use user-provided search_request if available, else fallback to default
+		search_request = payload.get("search_request", "Find universities that match my profile")
+		current_year = datetime.now().year
+		inputs = {
+			'user_id': user_profile_id,
+			'search_request': search_request,
+			'current_year': str(current_year),
+			'next_year': str(current_year + 1)
+		}
+		
+		crew = SearchCrew()
+		# Execute only the university search task
+		university_task = crew.university_search_task()
+		university_agent = crew.university_search_agent()
+		
+		# Create a crew with just the university agent and task
+		university_crew = Crew(
+			agents=[university_agent],
+			tasks=[university_task],
+			process=Process.sequential,
+			verbose=_CREW_VERBOSE
+		)
+		logger.info("Starting university search for user %s", user_profile_id)
+		logger.debug("Search inputs: %s", inputs)
+		
+		# Single kickoff: a parse failure is reported rather than paying for
+		# another full agent run (profile query + web searches + generation)
+		result = university_crew.kickoff(inputs=inputs)
+		
+		# Parse agent output
+		if hasattr(result, 'raw'):
+			agent_output = result.raw
+		else:
+			agent_output = str(result)
+		
+		logger.debug("Raw agent output:\n%s", agent_output)
+		
+		# Clean and parse JSON
+		cleaned_output = agent_output.strip()
+		
+		# Decode the first JSON array of objects in the output
+		universities = _extract_json(cleaned_output, "[", list, item_type=dict)
+		
+		if universities is None:
+			if "Action" in cleaned_output and "Profile Query Tool" in cleaned_output:
+				json_error = "Agent returned incomplete results - tool execution format detected"
+			else:
+				json_error = "Could not extract valid JSON array from agent output"
+			logger.error("University search returned invalid JSON: %s", json_error)
+			return {
+				"error": "Agent returned invalid JSON",
+				"search_id": search_id,
+				"raw_output": agent_output[:1000],
+				"json_error": json_error
+			}, HTTPStatus.INTERNAL_SERVER_ERROR
+		
+		logger.info("Parsed %d universities", len(universities))
+		
+		# Store university results
+		stored_at = datetime.now().isoformat()
+		rows = []
+		for university in universities:
+			if university.get("name"):  # Basic validation
+				# Extract recommendation metadata
+				recommendation_metadata = {
+					"data_completeness": university.get("data_completeness"),
+					"recommendation_confidence": university.get("recommendation_confidence"),
+					"preference_conflicts": university.get("preference_conflicts"),
+					"search_broadened": university.get("search_broadened"),
+					"missing_criteria": university.get("missing_criteria")
+				}
+				
+				# Acceptance Rate Formula: (Number of Admitted Students / Total Number of Applicants) × 100
+				# This represents the percentage of applicants who are admitted to the university
+				# Lower rates indicate more selective/competitive universities
+				# Example: 4% = Very selective (Stanford), 50% = Moderately selective (CSU)
+
+				rows.append({
+					"user_profile_id": user_profile_id,
+					"search_id": search_id,
+					"university_name": university.get("name"),
+					"location": university.get("location"),
+					"tuition": university.get("tuition"),
+					"acceptance_rate": university.get("acceptance_rate"),
+					"programs": university.get("programs", []),
+					"rank_category": university.get("rank_category"),
+					"why_fit": university.get("why_fit"),
+					"recommendation_metadata": recommendation_metadata,
+					"source": {
+						"agent_output": agent_output,
+						"stored_at": stored_at
+					}
+				})
+		
+		# Insert in batches to keep each request under the PostgREST payload limit
+		stored_count = 0
+		for start in range(0, len(rows), 100):
+			store_result = supabase.table("university_results").insert(rows[start:start + 100]).execute()
+			stored_count += len(store_result.data or [])
+		
+		# Log agent report to agent_reports_log
+		_log_agent_report_async(
+			agent_name="University Search Agent",
+			user_id=user_profile_id,
+			payload={
+				"universities_found": len(universities),
+				"universities_stored": stored_count,
+				"search_id": search_id,
+				"stored_at": stored_at
+			}
+		)
+		
+		return {
+			"message": "Search completed and results stored",
+			"search_id": search_id,
+			"universities_found": len(universities),
+			"universities_stored": stored_count,
+			"results_endpoint": f"/results/{user_profile_id}"
+		}, HTTPStatus.OK
+		
+	except ImportError:
+		return {
+			"error": "CrewAI agents not available",
+			"search_id": search_id,
+			"message": "Search logged but agent processing failed"
+		}, HTTPStatus.INTERNAL_SERVER_ERROR
+	except Exception as e:
+		return {
+			"error": f"Agent execution failed: {str(e)}",
+			"search_id": search_id
+		}, HTTPStatus.INTERNAL_SERVER_ERROR
+
+def _run_university_search_job(user_profile_id: int, search_id: int, payload: dict) -> None:
+	"""Background wrapper that records the search outcome in _search_jobs."""
+	try:
+		body, status = _run_university_search(user_profile_id, search_id, payload)
+	except Exception as exc:
+		logger.exception("Background university search %s failed", search_id)
+		body, status = {"error": str(exc), "search_id": search_id}, HTTPStatus.INTERNAL_SERVER_ERROR
+	_search_jobs.set(search_id, {
+		"status": "completed" if status == HTTPStatus.OK else "failed",
+		"http_status": int(status),
+		"result": body
+	})
+
+def _async_requested(payload: dict | None = None) -> bool:
+	"""True when the client asked for a background run via "async": true or ?async=true."""
+	if payload and payload.get("async") is True:
+		return True
+	return request.args.get("async", "").lower() == "true"
+
+def _run_agent_job(app: Flask, job_id: str, job_type: str, fn: Callable[..., tuple], *args) -> None:
+	"""Background wrapper that runs an agent helper and records its outcome in _agent_jobs."""
+	# Helpers may use flask.g (e.g. the memoized profile), which needs an app context
+	with app.app_context():
+		try:
+			body, status = fn(*args)
+		except Exception as exc:
+			logger.exception("Background %s job %s failed", job_type, job_id)
+			body, status = {"error": str(exc)}, HTTPStatus.INTERNAL_SERVER_ERROR
+	_agent_jobs.set(job_id, {
+		"job_type": job_type,
+		"status": "completed" if status < HTTPStatus.BAD_REQUEST else "failed",
+		"http_status": int(status),
+		"result": body
+	})
+
+def _start_agent_job(job_type: str, fn: Callable[..., tuple], *args):
+	"""
+	Queue an agent helper returning (body, status) on the job pool and
+	return a 202 response pointing at GET /jobs/<job_id>, so the request
+	thread isn't held for the length of a crew run.
+	"""
+	job_id = uuid.uuid4().hex
+	_agent_jobs.set(job_id, {"job_type": job_type, "status": "running"})
+	submit_job(_run_agent_job, current_app._get_current_object(), job_id, job_type, fn, *args)
+	return jsonify({
+		"message": "Job started",
+		"job_id": job_id,
+		"job_type": job_type,
+		"status": "running",
+		"status_endpoint": f"/jobs/{job_id}"
+	}), HTTPStatus.ACCEPTED
+
+def _log_agent_report_task(agent_name: str, user_id, payload: dict) -> None:
+	"""Background body for _log_agent_report_async; failures are logged, never raised."""
+	try:
+		get_event_handler().log_agent_report(agent_name=agent_name, user_id=user_id, payload=payload)
+	except Exception:
+		logger.exception("Failed to log agent report for %s (user %s)", agent_name, user_id)
+
+def _log_agent_report_async(agent_name: str, user_id, payload: dict) -> None:
+	"""
+	Record an agent report off the request thread. Logging runs conflict
+	checks and several inserts, none of which the response depends on, so it
+	goes to the bounded log queue rather than the request-path I/O pool.
+	"""
+	submit_log(_log_agent_report_task, agent_name, user_id, payload)
+
+def _dispatch_counselor_webhook(payload: dict) -> None:
+	"""Background body for /counselor_notifications; failures are logged, never raised."""
+	try:
+		resp = _webhook_session.post(_COUNSELOR_WEBHOOK_URL, json=payload, timeout=5)
+		if not 200 <= resp.status_code < 300:
+			logger.warning("Counselor webhook returned HTTP %s", resp.status_code)
+	except Exception:
+		logger.exception("Counselor webhook dispatch failed")
+
+def _parse_visa_output(agent_output: str) -> list:
+	"""
+	Extract visa records from visa agent output: the first top-level JSON
+	array of objects, else a single JSON object. Raises ValueError if neither is found.
+	"""
+	cleaned = agent_output.strip()
+	data = _extract_json(cleaned, "[", list, item_type=dict)
+	if data is None:
+		record = _extract_json(cleaned, "{", dict)
+		if record is None:
+			raise ValueError("No JSON visa data found in agent output")
+		data = [record]
+	return data
+
+def _store_visa_requirements(supabase, citizenship: str, destination: str, user_profile_id, data: list) -> int:
+	"""
+	Run change detection for each visa record from the agent and store them
+	all with one multi-row insert. Returns the number of rows stored.
+	"""
+	# Every record is compared against the same stored row, so fetch it once
+	prev_row = _fetch_latest_visa_row(supabase, citizenship, destination, user_profile_id) if data else None
+	rows = []
+	for item in data:
+		new_data = {
+			"visa_type": item.get("visa_type"),
+			"documents": item.get("required_documents"),
+			"process_steps": item.get("application_process"),
+			"fees": item.get("application_fees"),
+			"timelines": item.get("processing_time"),
+			"interview": item.get("interview_required"),
+			"post_graduation": item.get("post_graduation_options"),
+			"source_url": item.get("source_url"),
+			"disclaimer": item.get("disclaimer"),
+			"notes": item.get("notes", [])
+		}
+
+		# Detect changes
+		change_info = _detect_visa_changes(supabase, citizenship, destination, user_profile_id, new_data, prev_row=prev_row)
+		logger.debug("Change detection: %s", change_info)
+
+		rows.append({
+			"user_profile_id": user_profile_id,
+			"citizenship_country": citizenship,
+			"destination_country": destination,
+			**new_data,
+			"fetched_at": item.get("fetched_at"),
+			"last_updated": item.get("last_updated") or item.get("fetched_at"),
+			"alert_sent": not change_info["alert_needed"],  # Set to True if no alert needed
+			"change_summary": change_info
+		})
+
+	if not rows:
+		return 0
+	ins = supabase.table("visa_requirements").insert(rows).execute()
+	return len(ins.data or [])
+
+def _run_application_requirements(supabase, user_profile_id, university: str, program: str) -> tuple[dict, HTTPStatus]:
+	"""
+	Run the application requirements agent for one university/program and upsert
+	the records it returns. Returns (response body, HTTP status).
+	"""
+	try:
+		SearchCrew = _agent_crews().SearchCrew
+		crew = SearchCrew()
+		
+		app_req_task = crew.application_requirement_task()
+		app_req_agent = crew.application_requirement_agent()
+
+		logger.debug("Creating application requirement crew")
+		# Create a crew with just the application requirement agent and task
+		application_requirement_crew = Crew(
+			agents=[app_req_agent],
+			tasks=[app_req_task],
+			process=Process.sequential,
+			verbose=_CREW_VERBOSE
+		)
+
+		# Specific University Flow (only flow since all fields are required)
+		inputs = {
+			"user_id": user_profile_id,
+			"university": university,
+			"program": program,
+			"search_type": "specific"
+		}
+		result = application_requirement_crew.kickoff(inputs=inputs)
+
+		requirements_data = []
+		formatted_json = None
+		formatted_markdown = None
+
+		# Parse agent output
+		if hasattr(result, 'raw'):
+			agent_output = result.raw
+		else:
+			agent_output = str(result)
+
+		# Parse and store each requirement
+		try:
+			cleaned_output = agent_output.strip()
+
+			# Fast path: output is already a clean JSON document
+			data = _loads_if_json(cleaned_output)
+			if not isinstance(data, (dict, list)):
+				# Decode in place from the first '{' (handles explanations or markdown around it)
+				data = None
+				start_idx = cleaned_output.find('{')
+				if start_idx != -1:
+					try:
+						data, _ = _json_decoder.raw_decode(cleaned_output, start_idx)
+					except ValueError:
+						pass
+			if not isinstance(data, (dict, list)):
+				# Last resort for malformed JSON: slice out the outermost braces and drop trailing commas
+				match = _JSON_OBJECT_RE.search(cleaned_output)
+				if not match:
+					logger.warning("No valid JSON object found in application requirements output")
+					data = []
+				else:
+					json_text = match.group(0)
+
+					# Clean up JSON text more carefully
+					normalized_json = json_text.strip()
+				
+					# Remove any stray commas before closing brackets
+					normalized_json = _TRAILING_COMMA_RE.sub(r'\1', normalized_json)
+
+					try:
+						data = json.loads(normalized_json)
+					except json.JSONDecodeError as err:
+						logger.warning("Application requirements JSON decode failed after normalization: %s", err)
+						logger.debug("Raw extracted text: %s", json_text)
+						logger.debug("Normalized text: %s", normalized_json)
+						data = []
+
+			if isinstance(data, dict):
+				data = [data]  # Convert single result to list
+				
+			fetched_at = datetime.now().isoformat()
+			for req in data:
+				# Format each requirement using checklist_formatter
+				formatted_json = to_json_with_labels(req)
+				formatted_markdown = to_markdown(req)
+				
+				# Structure according to application_requirements table schema
+				requirement_data = {field: req.get(field, default) for field, default in _REQ_FIELDS}
+				requirement_data["user_profile_id"] = user_profile_id
+				requirement_data["fetched_at"] = fetched_at
+
+				requirements_data.append(requirement_data)
+
+			# Insert new / update existing entries in one upsert keyed on the unique
+			# (user_profile_id, university, program) index. Rows missing a key column
+			# can't be stored (NOT NULL), and a repeated pair keeps its last record
+			# since one upsert can't touch the same row twice.
+			rows_by_key = {
+				(row["university"], row["program"]): row
+				for row in requirements_data
+				if row["university"] and row["program"]
+			}
+			if rows_by_key:
+				supabase.table("application_requirements").upsert(
+					list(rows_by_key.values()),
+					on_conflict="user_profile_id,university,program"
+				).execute()
+				application_requirements_cache.pop(str(user_profile_id))
+
+		except Exception as e:
+			logger.error("Failed to process application requirements result: %s", e)
+			return {"error": str(e)}, HTTPStatus.INTERNAL_SERVER_ERROR
+
+		# Log agent report to agent_reports_log
+		_log_agent_report_async(
+			agent_name="Application Requirements Agent",
+			user_id=user_profile_id,
+			payload={
+				"application_requirements_stored": len(data) if isinstance(data, list) else 1,
+				"university": university,
+				"program": program,
+				"stored_at": fetched_at
+			}
+		)
+
+		response = {
+			"message": "Application requirements fetched and stored successfully",
+			"user_profile_id": user_profile_id,
+			"search_type": "specific",
+			"formatted_json": formatted_json,
+			"formatted_markdown": formatted_markdown,
+			"disclaimer": "All information is sourced from the official university website. Please verify before submitting your application."
+		}
+
+		return response, HTTPStatus.OK
+
+	except Exception as e:
+		logger.error("Application requirements agent failed: %s", e)
+		return {"error": str(e)}, HTTPStatus.INTERNAL_SERVER_ERROR
+
+def _fetch_admissions_overview(supabase, user_id: int, today_iso: str) -> dict:
+	"""
+	Overview block for the admissions summary: result counts per agent plus
+	the profile name. Uses the get_user_admissions_counts RPC so everything
+	comes back in one round-trip; falls back to concurrent count queries if
+	the function has not been deployed yet.
+	"""
+	try:
+		overview = supabase.rpc("get_user_admissions_counts", {
+			"p_user_profile_id": user_id,
+			"p_today": today_iso
+		}).execute().data
+		if isinstance(overview, dict):
+			return overview
+	except APIError as rpc_error:
+		logger.warning("get_user_admissions_counts RPC failed, using direct queries: %s", rpc_error)
+
+	# The overview queries are independent - run them concurrently.
+	# Exact counts come back in the Content-Range header; limit(1) keeps row payloads minimal
+	overview_queries = [
+		lambda: supabase.table("university_results").select("id", count="exact").eq("user_profile_id", user_id).limit(1).execute(),
+		lambda: supabase.table("scholarship_results").select("id", count="exact").eq("user_profile_id", user_id).gte("deadline", today_iso).limit(1).execute(),
+		lambda: supabase.table("application_requirements").select("id", count="exact").eq("user_profile_id", user_id).limit(1).execute(),
+		lambda: supabase.table("visa_requirements").select("id", count="exact").eq("user_profile_id", user_id).limit(1).execute()
+	]
+	# Reuse a profile already memoized on flask.g for this request; otherwise fetch
+	# just the name alongside the counts (pool threads can't touch flask.g)
+	profile_cache = g.get("user_profile_cache", {})
+	if user_id not in profile_cache:
+		overview_queries.append(
+			lambda: supabase.table("user_profile").select("full_name").eq("id", user_id).maybe_single().execute()
+		)
+	universities_resp, scholarships_resp, app_reqs_resp, visa_resp, *profile_resp = run_in_parallel(*overview_queries)
+	if profile_resp:
+		profile = profile_resp[0].data if profile_resp[0] else None
+	else:
+		profile = profile_cache[user_id]
+	
+	return {
+		"universities_found": universities_resp.count or 0,
+		"scholarships_found": scholarships_resp.count or 0,
+		"application_requirements": app_reqs_resp.count or 0,
+		"visa_info_count": visa_resp.count or 0,
+		"profile_name": profile.get("full_name") if profile else None
+	}
+
+def _run_admissions_summary(user_id: int) -> tuple[dict, HTTPStatus]:
+	"""
+	Run the Admissions Counselor (ManagerCrew) for a user, falling back to the
+	cached summary if it fails. Returns (response body, HTTP status).
+	"""
+	supabase = get_supabase()
+	
+	# Execute Admissions Counselor Agent with HIERARCHICAL ORCHESTRATION
+	try:
+		ManagerCrew = _agent_crews().ManagerCrew
+		
+		# Use ManagerCrew which has hierarchical process built-in
+		manager_crew_instance = ManagerCrew()
+		
+		# Get the crew instance (ready to use with hierarchical process)
+		admissions_crew = manager_crew_instance.crew()
+		
+		now = datetime.now()
+		inputs = {
+			'user_id': user_id,
+			'current_year': str(now.year),
+			'next_year': str(now.year + 1),
+			'today': now.date().isoformat(),  # Provide current date for deadline calculations
+			'search_type': 'full',  # For scholarship_search_task
+			# Profile data (citizenship_country, destination_country, university, program) will be read by agents from user profile
+			# Do not pass empty strings - agents use ProfileQueryTool/ProfileAccessTool to get this data
+		}
+		
+		logger.info("Starting admissions counselor (hierarchical ManagerCrew) for user %s", user_id)
+		logger.debug("Admissions counselor inputs: %s", inputs)
+		
+		result = admissions_crew.kickoff(inputs=inputs)
+		agent_output = result.raw if hasattr(result, 'raw') else str(result)
+		
+		logger.debug("Admissions counselor output: %s", agent_output)
+		
+		# Parse agent output, trying the whole output as JSON before slicing out an object
+		cleaned_output = agent_output.strip()
+		summary_data = _loads_if_json(cleaned_output)
+		if isinstance(summary_data, dict):
+			logger.debug("Parsed admissions counselor output")
+		else:
+			summary_data = None
+			start_idx = cleaned_output.find('{')
+			end_idx = cleaned_output.rfind('}')
+			
+			if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
+				json_content = cleaned_output[start_idx:end_idx + 1]
+				try:
+					summary_data = json.loads(json_content)
+					logger.debug("Parsed admissions counselor output")
+				except json.JSONDecodeError as e:
+					logger.warning("Could not parse admissions counselor output as JSON: %s", e)
+			else:
+				logger.warning("No JSON object found in admissions counselor output")
+		
+	except ImportError:
+		logger.warning("CrewAI agents not available, falling back to cached summary")
+		summary_data = None
+	except Exception as e:
+		logger.warning("Admissions counselor execution failed: %s", e)
+		summary_data = None
+	
+	# Fallback: try to return cached summary if agent failed
+	if summary_data is None:
+		logger.info("Admissions counselor produced no summary for user %s, returning cached summary", user_id)
+		
+		# Try to get cached summary from DB
+		cached_summary = supabase.table("admissions_summary").select(_ADMISSIONS_SUMMARY_COLUMNS).eq("user_id", user_id).order("last_updated", desc=True).limit(1).maybe_single().execute()
+		
+		if cached_summary:
+			# Return cached summary
+			summary_data = cached_summary.data
+		else:
+			# Return basic structure if no cache
+			summary_data = {
+				"current_stage": "Getting Started",
+				"progress_score": 0,
+				"active_agents": [],
+				"stress_flags": {"incomplete_profile": True, "approaching_deadlines": 0, "agent_conflicts": False},
+				"next_steps": [],
+				"overview": {"universities_found": 0, "scholarships_found": 0, "application_requirements": 0, "visa_info_count": 0},
+				"advice": ""
+			}
+		
+		# If no cached summary, add empty overview to basic structure
+		if not summary_data.get("overview"):
+			summary_data["overview"] = {"universities_found": 0, "scholarships_found": 0, "application_requirements": 0, "visa_info_count": 0}
+	else:
+		# Agent provided output - use it, save to database, and add overview data
+		# Taken after the kickoff (which can run for minutes) and shared by the counts and the stored row
+		stored_at = datetime.now()
+		today_iso = stored_at.date().isoformat()
+		summary_data["overview"] = _fetch_admissions_overview(supabase, user_id, today_iso)
+		
+		# Save or update admissions_summary in database (one row per user)
+		db_data = {
+			"user_id": user_id,
+			"current_stage": summary_data.get("current_stage"),
+			"progress_score": summary_data.get("progress_score"),
+			"active_agents": summary_data.get("active_agents", []),
+			"stress_flags": summary_data.get("stress_flags", {}),
+			"next_steps": summary_data.get("next_steps", []),
+			"advice": summary_data.get("advice", ""),
+			"last_updated": stored_at.isoformat()
+		}
+		
+		supabase.table("admissions_summary").upsert(db_data, on_conflict="user_id").execute()
+	
+	return summary_data, HTTPStatus.OK
+
+def _run_next_steps(user_id: int) -> tuple[dict, HTTPStatus]:
+	"""
+	Run the Next Steps Generator for a user and store the steps on their
+	admissions_summary row. Returns (response body, HTTP status).
+	"""
+	supabase = get_supabase()
+	
+	# Execute Next Steps Generator Agent using SearchCrew
+	try:
+		SearchCrew = _agent_crews().SearchCrew
+		
+		# Create SearchCrew instance
+		search_crew_instance = SearchCrew()
+		
+		# Get the next_steps_generator_agent and next_steps_generator_task
+		next_steps_agent = search_crew_instance.next_steps_generator_agent()
+		next_steps_task = search_crew_instance.next_steps_generator_task()
+		
+		# Create crew with just the Next Steps Generator Agent and Task
+		next_steps_crew = Crew(
+			agents=[next_steps_agent],
+			tasks=[next_steps_task],
+			process=Process.sequential,
+			verbose=_CREW_VERBOSE
+		)
+		
+		now = datetime.now()
+		inputs = {
+			'user_id': user_id,
+			'current_year': str(now.year),
+			'next_year': str(now.year + 1),
+			'today': now.date().isoformat()
+		}
+		
+		logger.info("Generating next steps for user %s", user_id)
+		result = next_steps_crew.kickoff(inputs=inputs)
+		agent_output = result.raw if hasattr(result, 'raw') else str(result)
+		
+		logger.debug("Next steps generator output: %s", agent_output)
+		
+		# Parse agent output - the whole output if it is a JSON array, else extract one
+		cleaned_output = agent_output.strip()
+		next_steps = _loads_if_json(cleaned_output)
+		if isinstance(next_steps, list):
+			logger.debug("Parsed %d next steps", len(next_steps))
+		else:
+			next_steps = []
+			start_idx = cleaned_output.find('[')
+			end_idx = cleaned_output.rfind(']')
+			
+			if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
+				json_content = cleaned_output[start_idx:end_idx + 1]
+				try:
+					next_steps = json.loads(json_content)
+					logger.debug("Parsed %d next steps", len(next_steps))
+				except json.JSONDecodeError as e:
+					logger.warning("Could not parse next steps output as JSON: %s", e)
+			else:
+				logger.warning("No JSON array found in next steps output")
+			
+	except ImportError:
+		logger.warning("CrewAI agents not available, falling back to empty next steps")
+		next_steps = []
+	except Exception as e:
+		logger.warning("Next steps generator execution failed: %s", e)
+		next_steps = []
+	
+	# Update admissions_summary table with generated next steps, creating the
+	# user's summary row if it doesn't exist (only these columns are written)
+	last_updated = datetime.now().isoformat()
+	supabase.table("admissions_summary").upsert({
+		"user_id": user_id,
+		"next_steps": next_steps,
+		"last_updated": last_updated
+	}, on_conflict="user_id").execute()
+	
+	return {
+		"user_id": user_id,
+		"next_steps": next_steps,
+		"total_count": len(next_steps),
+		"last_updated": last_updated
+	}, HTTPStatus.OK
+
 def register_routes(app: Flask) -> None:
 	@app.get("/api")
 	def home():
-		return jsonify({
-			"message": "Welcome to PG Admit - AI AGENTS",
-			"version": "1.0.0",
-			"endpoints": {
-				"health": "/health",
-				"get_profile": "/profile/<user_profile_id>",
-				"create_profile": "/profile",
-				"update_profile": "/profile/<user_profile_id>",
-				"delete_profile": "/profile/<user_profile_id>",
-				"get_token_balance": "/tokens/balance/<user_profile_id>",
-				"add_tokens": "/tokens/add/<user_profile_id>",
-				"search_universities": "/search_universities",
-				"search_scholarships": "/search_scholarships",
-				"get_university_results": "/results/<user_profile_id>",
-				"get_scholarship_results": "/results/scholarships/<user_profile_id>",
-				"fetch_application_requirements": "/fetch_application_requirements",
-				"get_application_requirements": "/application_requirements/<university>/<program>",
-				"visa_info": "/visa_info",
-				"get_visa_info": "/visa_info/<citizenship>/<destination>",
-				"visa_report": "/visa_report/<citizenship>/<destination>",
-				"get_visa_alerts": "/visa_alerts",
-				"mark_visa_alerts_sent": "/visa_alerts/mark_sent",
-				"admissions_summary": "/admissions/summary/<user_id>",
-				"admissions_next_steps": "/admissions/next_steps/<user_id>",
-				"update_admissions_stage": "/admissions/update_stage",
-				"log_agent_report": "/admissions/log_agent_report"
-			}
-		}), HTTPStatus.OK
+		resp = Response(_API_INDEX_BODY, status=HTTPStatus.OK, mimetype="application/json")
+		resp.set_etag(_API_INDEX_ETAG)
+		resp.cache_control.public = True
+		resp.cache_control.max_age = 3600
+		return resp.make_conditional(request)
 
 	@app.get("/health")
 	def health_check():
-		return jsonify({
-			"status": "healthy",
-			"message": "PG Admit API is running"
-		}), HTTPStatus.OK
+		return Response(_HEALTH_BODY, status=HTTPStatus.OK, mimetype="application/json")
 
 	# ==================== USER PROFILE CRUD ====================
 
@@ -95,16 +965,16 @@ def register_routes(app: Flask) -> None:
 		"""
 		try:
 			supabase = get_supabase()
-			profile_resp = supabase.table("user_profile").select("*").eq("id", user_profile_id).execute()
+			profile_resp = supabase.table("user_profile").select("*").eq("id", user_profile_id).maybe_single().execute()
 
-			if not profile_resp.data:
+			if not profile_resp:
 				return jsonify({
 					"error": f"User profile {user_profile_id} not found"
 				}), HTTPStatus.NOT_FOUND
 
 			return jsonify({
 				"success": True,
-				"profile": profile_resp.data[0]
+				"profile": profile_resp.data
 			}), HTTPStatus.OK
 
 		except Exception as exc:
@@ -137,7 +1007,7 @@ def register_routes(app: Flask) -> None:
 		Returns: Created profile with ID
 		"""
 		try:
-			payload = request.get_json(silent=True) or {}
+			payload = _parse_body()
 
 			# Validate required field
 			if not payload.get("full_name"):
@@ -187,7 +1057,7 @@ def register_routes(app: Flask) -> None:
 		Note: Updates are logged to user_profile_changes table for event-driven re-searches.
 		"""
 		try:
-			payload = request.get_json(silent=True) or {}
+			payload = _parse_body()
 
 			if not payload:
 				return jsonify({
@@ -197,13 +1067,13 @@ def register_routes(app: Flask) -> None:
 			supabase = get_supabase()
 
 			# Check if profile exists
-			existing = supabase.table("user_profile").select("*").eq("id", user_profile_id).execute()
-			if not existing.data:
+			existing = supabase.table("user_profile").select("*").eq("id", user_profile_id).maybe_single().execute()
+			if not existing:
 				return jsonify({
 					"error": f"User profile {user_profile_id} not found"
 				}), HTTPStatus.NOT_FOUND
 
-			old_profile = existing.data[0]
+			old_profile = existing.data
 
 			# Build update data with allowed fields only
 			allowed_fields = [
@@ -228,7 +1098,7 @@ def register_routes(app: Flask) -> None:
 							"new_value": json.dumps(new_value) if not isinstance(new_value, str) else new_value
 						}).execute()
 					except Exception as log_exc:
-						print(f"[WARN] Failed to log profile change: {log_exc}")
+						logger.warning("Failed to log profile change: %s", log_exc)
 
 			# Perform update
 			result = supabase.table("user_profile").update(update_data).eq("id", user_profile_id).execute()
@@ -266,14 +1136,18 @@ def register_routes(app: Flask) -> None:
 			supabase = get_supabase()
 
 			# Check if profile exists
-			existing = supabase.table("user_profile").select("id").eq("id", user_profile_id).execute()
-			if not existing.data:
+			existing = supabase.table("user_profile").select("id").eq("id", user_profile_id).maybe_single().execute()
+			if not existing:
 				return jsonify({
 					"error": f"User profile {user_profile_id} not found"
 				}), HTTPStatus.NOT_FOUND
 
 			# Delete profile (cascades to related tables)
 			supabase.table("user_profile").delete().eq("id", user_profile_id).execute()
+			user_exists_cache.pop(user_profile_id)
+			token_balance_cache.pop(user_profile_id)
+			scholarship_results_cache.pop(user_profile_id)
+			application_requirements_cache.pop(str(user_profile_id))
 
 			return jsonify({
 				"success": True,
@@ -301,14 +1175,12 @@ def register_routes(app: Flask) -> None:
 		Returns: Token balance and recent usage
 		"""
 		try:
-			from .token_tracker import get_user_token_balance
-
 			result = get_user_token_balance(user_profile_id)
 
 			if not result.get("success"):
 				return jsonify({
 					"error": result.get("error", "Failed to get token balance")
-				}), HTTPStatus.NOT_FOUND if "not found" in result.get("error", "").lower() else HTTPStatus.INTERNAL_SERVER_ERROR
+				}), HTTPStatus.NOT_FOUND if result.get("not_found") else HTTPStatus.INTERNAL_SERVER_ERROR
 
 			return jsonify(result), HTTPStatus.OK
 
@@ -325,31 +1197,32 @@ def register_routes(app: Flask) -> None:
 
 		POST /tokens/add/{user_profile_id}
 		Headers: Authorization: Bearer <supabase_jwt_token>
+			Idempotency-Key: <unique key> (optional, retries with the same key are credited once)
 		Body: {
 			"tokens": int (required),
-			"reason": str (optional, default: "manual_add")
+			"reason": str (optional, default: "manual_add"),
+			"idempotency_key": str (optional, alternative to the header)
 		}
 
 		Returns: Updated token balance
 		"""
 		try:
-			from .token_tracker import add_tokens_to_user
-
-			payload = request.get_json(silent=True) or {}
+			payload = _parse_body()
 			tokens = payload.get("tokens")
 			reason = payload.get("reason", "manual_add")
+			idempotency_key = request.headers.get("Idempotency-Key") or payload.get("idempotency_key")
 
 			if not tokens or not isinstance(tokens, int) or tokens <= 0:
 				return jsonify({
 					"error": "Field 'tokens' is required and must be a positive integer"
 				}), HTTPStatus.BAD_REQUEST
 
-			result = add_tokens_to_user(user_profile_id, tokens, reason)
+			result = add_tokens_to_user(user_profile_id, tokens, reason, idempotency_key)
 
 			if not result.get("success"):
 				return jsonify({
 					"error": result.get("error", "Failed to add tokens")
-				}), HTTPStatus.NOT_FOUND if "not found" in result.get("error", "").lower() else HTTPStatus.INTERNAL_SERVER_ERROR
+				}), HTTPStatus.NOT_FOUND if result.get("not_found") else HTTPStatus.INTERNAL_SERVER_ERROR
 
 			return jsonify(result), HTTPStatus.OK
 
@@ -363,243 +1236,91 @@ def register_routes(app: Flask) -> None:
 	@app.post("/search_universities")
 	@require_auth
 	def search_universities():
-		payload = request.get_json(silent=True) or {}
+		payload = _parse_body()
 		user_profile_id = payload.get("user_profile_id")
 		
 		if not user_profile_id:
 			return jsonify({"error": "user_profile_id is required"}), HTTPStatus.BAD_REQUEST
 		
 		try:
-			supabase = get_supabase()
-			
-			# Get user profile snapshot for logging
-			profile_resp = supabase.table("user_profile").select("*").eq("id", user_profile_id).execute()
-			if not profile_resp.data:
+			# Snapshot the profile and log the search request
+			search = _begin_university_search(user_profile_id, payload)
+			if not search:
 				return jsonify({"error": f"User profile {user_profile_id} not found"}), HTTPStatus.NOT_FOUND
 			
-			profile_snapshot = {
-				"timestamp": datetime.now().isoformat(),
-				"profile": profile_resp.data[0]
-			}
-			
-			# Log search request with profile snapshot
-			search_payload = {
-				**payload,
-				"profile_snapshot": profile_snapshot,
-				"request_timestamp": datetime.now().isoformat()
-			}
-			
-			search_result = supabase.table("search_requests").insert({
-				"user_profile_id": user_profile_id,
-				"request_payload": search_payload,
-			}).execute()
-			
-			if not search_result.data:
+			if not search.get("search_id"):
 				return jsonify({"error": "Failed to log search request"}), HTTPStatus.INTERNAL_SERVER_ERROR
 			
-			search_id = search_result.data[0]["id"]
+			search_id = search["search_id"]
 			
-			# Execute CrewAI agent and store results
-			try:
-				from agents.crew import SearchCrew
-				# Use user-provided search_request if available, else fallback to default
-				search_request = payload.get("search_request", "Find universities that match my profile")
-				# Run the agent with retry loop for invalid JSON
-				inputs = {
-					'user_id': user_profile_id,
-					'search_request': search_request,
-					'current_year': str(datetime.now().year),
-					'next_year': str(datetime.now().year + 1)
-				}
-				
-				crew = SearchCrew()
-				# Execute only the university search task
-				university_task = crew.university_search_task()
-				university_agent = crew.university_search_agent()
-				
-				# Create a crew with just the university agent and task
-				from crewai import Crew, Process
-				university_crew = Crew(
-					agents=[university_agent],
-					tasks=[university_task],
-					process=Process.sequential,
-					verbose=True
-				)
-				universities = None
-				last_error = None
-				
-				# Try up to 3 times to get valid JSON
-				for attempt in range(3):
-					try:
-						print(f"\nSTARTING CREWAI SEARCH - ATTEMPT {attempt + 1}")
-						print(f"User ID: {user_profile_id}")
-						print(f"Search inputs: {inputs}")
-						print("=" * 60)
-						
-						result = university_crew.kickoff(inputs=inputs)
-						
-						# Parse agent output
-						if hasattr(result, 'raw'):
-							agent_output = result.raw
-						else:
-							agent_output = str(result)
-						
-						print(f"\nRAW AGENT OUTPUT - ATTEMPT {attempt + 1}")
-						print("=" * 60)
-						print(agent_output)
-						print("=" * 60)
-						
-						# Clean and parse JSON
-						cleaned_output = agent_output.strip()
-						
-						# Enhanced JSON extraction to handle various agent output formats
-						universities = None
-						
-						# Strategy 1: Look for JSON array with [ and ]
-						start_idx = cleaned_output.find('[')
-						end_idx = cleaned_output.rfind(']')
-						
-						if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
-							json_content = cleaned_output[start_idx:end_idx + 1]
-							try:
-								universities = json.loads(json_content)
-								if isinstance(universities, list):
-									print(f"✅ Found JSON array using bracket extraction")
-								else:
-									universities = None
-							except:
-								universities = None
-						
-						# Strategy 2: If no array found, check if output contains tool execution metadata
-						if universities is None:
-							print(f"No JSON array found, checking for tool execution format...")
-							if "Action" in cleaned_output and "Profile Query Tool" in cleaned_output:
-								print(f"Agent returned tool execution format instead of final results")
-								print(f"   This suggests the agent didn't complete the university search task")
-								raise ValueError("Agent returned incomplete results - tool execution format detected")
-							
-							# Strategy 3: Try to parse entire output as fallback
-							try:
-								universities = json.loads(cleaned_output)
-								if not isinstance(universities, list):
-									raise ValueError("Expected JSON array")
-								print(f"✅ Found JSON using full output parsing")
-							except:
-								raise ValueError("Could not extract valid JSON array from agent output")
-						
-						# If we get here, JSON is valid - break out of retry loop
-						print(f"\n✅ JSON PARSING SUCCESSFUL - ATTEMPT {attempt + 1}")
-						print(f"Found {len(universities)} universities")
-						print("=" * 60)
-						
-						break
-						
-					except (json.JSONDecodeError, ValueError) as e:
-						last_error = e
-						if attempt < 2:  # Not the last attempt
-							print(f"Retrying... (attempt {attempt + 2}/3)")
-							continue
-						else:
-							# Last attempt failed
-							print(f"\nALL ATTEMPTS FAILED - RETURNING ERROR")
-							print("=" * 60)
-							return jsonify({
-								"error": "Agent returned invalid JSON after 3 attempts",
-								"search_id": search_id,
-								"raw_output": agent_output[:1000] if 'agent_output' in locals() else "No output",
-								"json_error": str(last_error)
-							}), HTTPStatus.INTERNAL_SERVER_ERROR
-				
-				# Store university results
-				stored_count = 0
-				for university in universities:
-					if university.get("name"):  # Basic validation
-						# Extract recommendation metadata
-						recommendation_metadata = {
-							"data_completeness": university.get("data_completeness"),
-							"recommendation_confidence": university.get("recommendation_confidence"),
-							"preference_conflicts": university.get("preference_conflicts"),
-							"search_broadened": university.get("search_broadened"),
-							"missing_criteria": university.get("missing_criteria")
-						}
-						
-						# Acceptance Rate Formula: (Number of Admitted Students / Total Number of Applicants) × 100
-						# This represents the percentage of applicants who are admitted to the university
-						# Lower rates indicate more selective/competitive universities
-						# Example: 4% = Very selective (Stanford), 50% = Moderately selective (CSU)
-
-						result_data = {
-							"user_profile_id": user_profile_id,
-							"search_id": search_id,
-							"university_name": university.get("name"),
-							"location": university.get("location"),
-							"tuition": university.get("tuition"),
-							"acceptance_rate": university.get("acceptance_rate"),
-							"programs": university.get("programs", []),
-							"rank_category": university.get("rank_category"),
-							"why_fit": university.get("why_fit"),
-							"recommendation_metadata": recommendation_metadata,
-							"source": {
-								"agent_output": agent_output,
-								"stored_at": datetime.now().isoformat()
-							}
-						}
-						
-						store_result = supabase.table("university_results").insert(result_data).execute()
-						if store_result.data:
-							stored_count += 1
-				
-				# Log agent report to agent_reports_log
-				from .agent_event_handler import get_event_handler
-				get_event_handler().log_agent_report(
-					agent_name="University Search Agent",
-					user_id=user_profile_id,
-					payload={
-						"universities_found": len(universities),
-						"universities_stored": stored_count,
-						"search_id": search_id,
-						"stored_at": datetime.now().isoformat()
-					}
-				)
-				
+			# Run in the background when requested; poll /search_universities/<search_id> for the outcome
+			if _async_requested(payload):
+				_search_jobs.set(search_id, {"status": "running"})
+				submit_job(_run_university_search_job, user_profile_id, search_id, payload)
 				return jsonify({
-					"message": "Search completed and results stored",
+					"message": "Search started",
 					"search_id": search_id,
-					"universities_found": len(universities),
-					"universities_stored": stored_count,
-					"results_endpoint": f"/results/{user_profile_id}"
-				}), HTTPStatus.OK
-				
-			except ImportError:
-				return jsonify({
-					"error": "CrewAI agents not available",
-					"search_id": search_id,
-					"message": "Search logged but agent processing failed"
-				}), HTTPStatus.INTERNAL_SERVER_ERROR
-			except Exception as e:
-				return jsonify({
-					"error": f"Agent execution failed: {str(e)}",
-					"search_id": search_id
-				}), HTTPStatus.INTERNAL_SERVER_ERROR
+					"status": "running",
+					"status_endpoint": f"/search_universities/{search_id}"
+				}), HTTPStatus.ACCEPTED
+			
+			# Execute CrewAI agent and store results
+			body, status = _run_university_search(user_profile_id, search_id, payload)
+			return jsonify(body), status
 			
 		except Exception as exc:
 			return jsonify({"error": str(exc)}), HTTPStatus.INTERNAL_SERVER_ERROR
 
+	@app.get("/search_universities/<int:search_id>")
+	@require_auth
+	def get_university_search_status(search_id: int):
+		"""
+		Poll the status of a university search started with "async": true.
+
+		GET /search_universities/{search_id}
+		Headers: Authorization: Bearer <supabase_jwt_token>
+
+		Returns: status ("running", "completed", "failed" or "unknown") and,
+		once finished, the same body the synchronous endpoint returns
+		"""
+		job = _search_jobs.get(search_id)
+		if job:
+			return jsonify({"search_id": search_id, **job}), HTTPStatus.OK
+
+		# Job not tracked by this process (restart or another worker) - fall back to stored rows
+		try:
+			supabase = get_supabase()
+			search_resp = supabase.table("search_requests").select("id, user_profile_id").eq("id", search_id).maybe_single().execute()
+			if not search_resp:
+				return jsonify({"error": f"Search {search_id} not found"}), HTTPStatus.NOT_FOUND
+
+			results_resp = supabase.table("university_results").select("id", count="exact") \
+				.eq("search_id", search_id).limit(1).execute()
+			stored = results_resp.count or 0
+			return jsonify({
+				"search_id": search_id,
+				"status": "completed" if stored else "unknown",
+				"universities_stored": stored,
+				"results_endpoint": f"/results/{search_resp.data['user_profile_id']}"
+			}), HTTPStatus.OK
+		except Exception as exc:
+			return jsonify({"error": str(exc)}), HTTPStatus.INTERNAL_SERVER_ERROR
+
 	@app.get("/results/<int:user_profile_id>")
 	@require_auth
 	def get_results(user_profile_id: int):
 		try:
 			supabase = get_supabase()
 			
-			# Get university results
-			resp = supabase.table("university_results").select("*") \
-				.eq("user_profile_id", user_profile_id) \
-				.order("created_at", desc=True).limit(100).execute()
-			
-			# Get latest search info for context
-			search_resp = supabase.table("search_requests").select("id, created_at, request_payload") \
-				.eq("user_profile_id", user_profile_id) \
-				.order("created_at", desc=True).limit(1).execute()
+			# University results and latest search info are independent - fetch them concurrently
+			resp, search_resp = run_in_parallel(
+				lambda: supabase.table("university_results").select("*")
+					.eq("user_profile_id", user_profile_id)
+					.order("created_at", desc=True).limit(100).execute(),
+				lambda: supabase.table("search_requests").select("id, created_at, request_payload")
+					.eq("user_profile_id", user_profile_id)
+					.order("created_at", desc=True).limit(1).maybe_single().execute()
+			)
 			
 			response_data = {
 				"user_profile_id": user_profile_id,
@@ -608,15 +1329,16 @@ def register_routes(app: Flask) -> None:
 			}
 			
 			# Add latest search context
-			if search_resp.data:
-				latest_search = search_resp.data[0]
+			if search_resp:
+				latest_search = search_resp.data
 				response_data["latest_search"] = {
 					"search_id": latest_search["id"],
 					"timestamp": latest_search["created_at"],
 					"has_profile_snapshot": "profile_snapshot" in latest_search.get("request_payload", {})
 				}
 			
-			return jsonify(response_data), HTTPStatus.OK
+			# Up to 100 full result rows - skip jsonify's dumps/encode and indentation
+			return _json_response(response_data, HTTPStatus.OK, pretty=False)
 			
 		except Exception as exc:
 			return jsonify({"error": str(exc)}), HTTPStatus.INTERNAL_SERVER_ERROR
@@ -634,14 +1356,15 @@ def register_routes(app: Flask) -> None:
 			"changed_fields": [str] (optional) - which fields changed for delta search
 		}
 		"""
-		payload = request.get_json(silent=True) or {}
+		payload = _parse_body()
 		user_profile_id = payload.get("user_profile_id")
 		delta_search = payload.get("delta_search", False)
 		changed_fields_raw = payload.get("changed_fields", [])
 		
 		# CRITICAL: Ensure changed_fields is always a list to prevent "argument of type 'int' is not iterable" errors
 		if not isinstance(changed_fields_raw, list):
-			print(f"WARNING: changed_fields is not a list! Type: {type(changed_fields_raw)}, Value: {changed_fields_raw}. Converting to empty list.")
+			logger.warning("changed_fields is not a list (type %s, value %r); using an empty list",
+				type(changed_fields_raw).__name__, changed_fields_raw)
 			changed_fields = []
 		else:
 			changed_fields = changed_fields_raw
@@ -649,166 +1372,122 @@ def register_routes(app: Flask) -> None:
 		if not user_profile_id:
 			return jsonify({"error": "user_profile_id is required"}), HTTPStatus.BAD_REQUEST
 		
+		# SIMPLIFIED APPROACH: Always use unified full search logic
+		# This eliminates the complex delta vs full search distinction that was causing duplicates
+		# Execute Scholarship Search Agent
 		try:
 			supabase = get_supabase()
 			
 			# Verify user profile exists
-			profile_resp = supabase.table("user_profile").select("*").eq("id", user_profile_id).execute()
-			if not profile_resp.data:
+			user_profile = _get_user_profile(user_profile_id)
+			if not user_profile:
 				return jsonify({"error": f"User profile {user_profile_id} not found"}), HTTPStatus.NOT_FOUND
 			
-			user_profile = profile_resp.data[0]
+			SearchCrew = _agent_crews().SearchCrew
+			
+			# UNIFIED APPROACH: Always use comprehensive 'full' search logic
+			# Whether triggered manually or by profile changes, same comprehensive behavior:
+			# - Complete scholarship discovery and matching
+			# - Automatic duplicate removal and expiration cleanup  
+			# - Profile Changes Tool called for audit when change-triggered
+			search_type_to_use = "full"  # Unified comprehensive search approach
+			
+			# Run the scholarship agent
+			current_year = datetime.now().year
+			inputs = {
+				'user_id': user_profile_id,
+				'search_type': search_type_to_use,  # Always use 'full' for reliability
+				'profile_triggered': delta_search,  # Pass if this was triggered by profile changes
+				'changed_fields': changed_fields if delta_search else [],  # Pass what changed
+				'current_year': str(current_year),
+				'next_year': str(current_year + 1)
+			}
 			
-			# SIMPLIFIED APPROACH: Always use unified full search logic
-			# This eliminates the complex delta vs full search distinction that was causing duplicates
-			# Execute Scholarship Search Agent
-			try:
-				from agents.crew import SearchCrew
-				
-				# UNIFIED APPROACH: Always use comprehensive 'full' search logic
-				# Whether triggered manually or by profile changes, same comprehensive behavior:
-				# - Complete scholarship discovery and matching
-				# - Automatic duplicate removal and expiration cleanup  
-				# - Profile Changes Tool called for audit when change-triggered
-				search_type_to_use = "full"  # Unified comprehensive search approach
-				
-				# Run the scholarship agent
-				inputs = {
-					'user_id': user_profile_id,
-					'search_type': search_type_to_use,  # Always use 'full' for reliability
-					'profile_triggered': delta_search,  # Pass if this was triggered by profile changes
-					'changed_fields': changed_fields if delta_search else [],  # Pass what changed
-					'current_year': str(datetime.now().year),
-					'next_year': str(datetime.now().year + 1)
-				}
-				
-				crew = SearchCrew()
-				# Execute only the scholarship search task
-				scholarship_task = crew.scholarship_search_task()
-				scholarship_agent = crew.scholarship_search_agent()
-				
-				# Create a crew with just the scholarship agent and task
-				from crewai import Crew, Process
-				scholarship_crew = Crew(
-					agents=[scholarship_agent],
-					tasks=[scholarship_task],
-					process=Process.sequential,
-					verbose=True
-				)
-				
-				scholarships = None
-				last_error = None
-				
-				# Try up to 3 times to get valid JSON
-				for attempt in range(3):
-					try:
-						result = scholarship_crew.kickoff(inputs=inputs)
-						
-						# Parse agent output
-						if hasattr(result, 'raw'):
-							agent_output = result.raw
-						else:
-							agent_output = str(result)
-						
-						# Clean and parse JSON
-						cleaned_output = agent_output.strip()
-						
-						# Extract JSON array
-						start_idx = cleaned_output.find('[')
-						end_idx = cleaned_output.rfind(']')
-						
-						if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
-							json_content = cleaned_output[start_idx:end_idx + 1]
-							try:
-								scholarships = json.loads(json_content)
-								if isinstance(scholarships, list):
-									break
-								else:
-									scholarships = None
-							except:
-								scholarships = None
-						
-						if scholarships is None:
-							# Try to parse entire output as fallback
-							try:
-								scholarships = json.loads(cleaned_output)
-								if not isinstance(scholarships, list):
-									raise ValueError("Expected JSON array")
-								break
-							except:
-								raise ValueError("Could not extract valid JSON array from scholarship agent output")
-						
-					except (json.JSONDecodeError, ValueError) as e:
-						last_error = e
-						if attempt < 2:  # Not the last attempt
-							continue
-						else:
-							# Last attempt failed
-							return jsonify({
-								"error": "Scholarship agent returned invalid JSON after 3 attempts",
-								"user_profile_id": user_profile_id,
-								"raw_output": agent_output[:1000] if 'agent_output' in locals() else "No output",
-								"json_error": str(last_error)
-							}), HTTPStatus.INTERNAL_SERVER_ERROR
-				
-				# Query database to get total count of scholarships for this user
-				try:
-					total_scholarships = supabase.table("scholarship_results").select("id").eq("user_profile_id", user_profile_id).execute()
-					total_count = len(total_scholarships.data) if total_scholarships.data else 0
-				except Exception as e:
-					print(f"Error querying scholarship count: {e}")
-					total_count = 0
-				
-				# Log agent report to agent_reports_log
-				from .agent_event_handler import get_event_handler
-				get_event_handler().log_agent_report(
-					agent_name="Scholarship Search Agent",
-					user_id=user_profile_id,
-					payload={
-						"scholarships_found": len(scholarships) if scholarships else 0,
-						"total_scholarships_stored": total_count,
-						"stored_at": datetime.now().isoformat()
-					}
-				)
-				
-				# Return formatted JSON for scholarship search completion
-				search_response = {
-					"message": "Scholarship search completed successfully",
+			crew = SearchCrew()
+			# Execute only the scholarship search task
+			scholarship_task = crew.scholarship_search_task()
+			scholarship_agent = crew.scholarship_search_agent()
+			
+			# Create a crew with just the scholarship agent and task
+			scholarship_crew = Crew(
+				agents=[scholarship_agent],
+				tasks=[scholarship_task],
+				process=Process.sequential,
+				verbose=_CREW_VERBOSE
+			)
+			
+			# Single kickoff: malformed output is usually deterministic, so a
+			# rerun would just repeat the whole agent run
+			result = scholarship_crew.kickoff(inputs=inputs)
+			# The agent's tools rewrite stored scholarships, so cached views are stale
+			# (GET /scholarships caches under the int id; the payload may carry a string)
+			scholarship_results_cache.pop(int(user_profile_id))
+			
+			# Parse agent output
+			if hasattr(result, 'raw'):
+				agent_output = result.raw
+			else:
+				agent_output = str(result)
+			
+			# Decode the first JSON array of objects (string-aware, ignores surrounding commentary)
+			scholarships = _extract_json(agent_output.strip(), "[", list, item_type=dict)
+			if scholarships is None:
+				return jsonify({
+					"error": "Scholarship agent returned invalid JSON",
 					"user_profile_id": user_profile_id,
+					"raw_output": agent_output[:1000],
+					"json_error": "Could not extract valid JSON array from scholarship agent output"
+				}), HTTPStatus.INTERNAL_SERVER_ERROR
+			
+			# Query database to get total count of scholarships for this user
+			try:
+				# Exact count from the Content-Range header; limit(1) keeps the row payload minimal
+				total_scholarships = supabase.table("scholarship_results").select("id", count="exact") \
+					.eq("user_profile_id", user_profile_id).limit(1).execute()
+				total_count = total_scholarships.count or 0
+			except Exception as e:
+				logger.warning("Error querying scholarship count for user %s: %s", user_profile_id, e)
+				total_count = 0
+			
+			# Log agent report to agent_reports_log
+			_log_agent_report_async(
+				agent_name="Scholarship Search Agent",
+				user_id=user_profile_id,
+				payload={
+					"scholarships_found": len(scholarships) if scholarships else 0,
 					"total_scholarships_stored": total_count,
-					"results_endpoint": f"/results/scholarships/{user_profile_id}",
-					"note": "Expired scholarships automatically filtered out before storage",
-					"disclaimer": "This system provides scholarship opportunity matching based on eligibility criteria. We cannot guarantee that users will win any scholarships."
+					"stored_at": datetime.now().isoformat()
 				}
-				
-				return app.response_class(
-					response=json.dumps(search_response, indent=2, ensure_ascii=False),
-					status=HTTPStatus.OK,
-					mimetype='application/json'
-				)
-				
-			except ImportError:
-				return jsonify({
-					"error": "Scholarship Search Agent not available",
-					"message": "Scholarship search infrastructure ready but agent not implemented",
-					"user_profile_id": user_profile_id
-				}), HTTPStatus.SERVICE_UNAVAILABLE
-			except Exception as e:
-				import traceback
-				error_traceback = traceback.format_exc()
-				print(f"ERROR in scholarship search - Full traceback:")
-				print(error_traceback)
-				print(f"ERROR Type: {type(e).__name__}")
-				print(f"ERROR Message: {str(e)}")
-				return jsonify({
-					"error": f"Scholarship search execution failed: {str(e)}",
-					"error_type": type(e).__name__,
-					"traceback": error_traceback,
-					"user_profile_id": user_profile_id
-				}), HTTPStatus.INTERNAL_SERVER_ERROR
+			)
 			
-		except Exception as exc:
-			return jsonify({"error": str(exc)}), HTTPStatus.INTERNAL_SERVER_ERROR
+			# Return formatted JSON for scholarship search completion
+			search_response = {
+				"message": "Scholarship search completed successfully",
+				"user_profile_id": user_profile_id,
+				"total_scholarships_stored": total_count,
+				"results_endpoint": f"/results/scholarships/{user_profile_id}",
+				"note": "Expired scholarships automatically filtered out before storage",
+				"disclaimer": "This system provides scholarship opportunity matching based on eligibility criteria. We cannot guarantee that users will win any scholarships."
+			}
+			
+			return _json_response(search_response, HTTPStatus.OK)
+			
+		except ImportError:
+			return jsonify({
+				"error": "Scholarship Search Agent not available",
+				"message": "Scholarship search infrastructure ready but agent not implemented",
+				"user_profile_id": user_profile_id
+			}), HTTPStatus.SERVICE_UNAVAILABLE
+		except Exception as e:
+			# Traceback is only rendered for the log if a handler accepts ERROR
+			logger.exception("Scholarship search failed for user %s", user_profile_id)
+			error_traceback = traceback.format_exc()
+			return jsonify({
+				"error": f"Scholarship search execution failed: {str(e)}",
+				"error_type": type(e).__name__,
+				"traceback": error_traceback,
+				"user_profile_id": user_profile_id
+			}), HTTPStatus.INTERNAL_SERVER_ERROR
 
 	@app.get("/results/scholarships/<int:user_profile_id>")
 	@require_auth
@@ -833,78 +1512,78 @@ def register_routes(app: Flask) -> None:
 			except (ValueError, TypeError):
 				limit = 100
 			
+			# Polling clients repeat identical requests; serve them from the short-lived cache
+			view_key = (active_only, category_filter, limit)
+			cached_views = scholarship_results_cache.get(user_profile_id)
+			if cached_views is not None and view_key in cached_views:
+				return _json_response(cached_views[view_key], HTTPStatus.OK)
+			
 			# Build and execute query
+			today = datetime.now().date()
 			query = supabase.table("scholarship_results").select("*").eq("user_profile_id", user_profile_id)
 			
 			if active_only:
-				query = query.gte("deadline", datetime.now().date().isoformat())
+				query = query.gte("deadline", today.isoformat())
 			if category_filter:
 				query = query.eq("category", category_filter)
 			
-			resp = query.order("deadline", desc=False).order("matched_at", desc=True).limit(limit).execute()
-			
-			# Get profile changes
-			changes_resp = supabase.table("user_profile_changes").select("field_name, changed_at") \
-				.eq("user_profile_id", user_profile_id).order("changed_at", desc=True).limit(5).execute()
+			# Scholarships and recent profile changes are independent - fetch them concurrently
+			resp, changes_resp = run_in_parallel(
+				lambda: query.order("deadline", desc=False).order("matched_at", desc=True).limit(limit).execute(),
+				lambda: supabase.table("user_profile_changes").select("field_name, changed_at")
+					.eq("user_profile_id", user_profile_id).order("changed_at", desc=True).limit(5).execute()
+			)
 			
 			# Process scholarships
 			scholarships = resp.data or []
 			
 			# If no scholarships found, return simple message
 			if not scholarships:
-				return app.response_class(
-					response=json.dumps({
-						"message": f"No scholarship results found for user {user_profile_id}",
-						"user_profile_id": user_profile_id,
-						"total_scholarships": 0,
-						"suggestion": "Try running a scholarship search first with: POST /search_scholarships"
-					}, indent=2),
-					status=HTTPStatus.OK,
-					mimetype='application/json'
-				)
+				return _json_response({
+					"message": f"No scholarship results found for user {user_profile_id}",
+					"user_profile_id": user_profile_id,
+					"total_scholarships": 0,
+					"suggestion": "Try running a scholarship search first with: POST /search_scholarships"
+				}, HTTPStatus.OK)
 			
 			urgent_scholarships = []
 			upcoming_scholarships = []
 			future_scholarships = []
 			expired_scholarships = []
-			current_date = datetime.now().date()
+			# Bucket by days until deadline: < 0 expired, <= 30 urgent, <= 90 upcoming, else future
+			# (bound append methods, so the loop skips the attribute lookup per row)
+			bucket_appends = (expired_scholarships.append, urgent_scholarships.append,
+				upcoming_scholarships.append, future_scholarships.append)
+			add_future = future_scholarships.append
+			today_ordinal = today.toordinal()
+			# Distinct categories in first-seen order, collected in the same pass
+			categories = {}
 			
 			for scholarship in scholarships:
-				if scholarship.get("deadline"):
+				category = scholarship.get("category")
+				if category:
+					categories[category] = None
+				deadline = scholarship.get("deadline")
+				if deadline:
 					try:
-						deadline_str = scholarship["deadline"]
 						# Handle both string and date objects
-						if isinstance(deadline_str, str):
-							deadline_date = datetime.fromisoformat(deadline_str).date()
-						else:
-							deadline_date = deadline_str
-						
-						days_until_deadline = (deadline_date - current_date).days
-						scholarship["days_until_deadline"] = days_until_deadline
-						
-						if days_until_deadline < 0:
-							expired_scholarships.append(scholarship)
-						elif days_until_deadline <= 30:
-							urgent_scholarships.append(scholarship)
-						elif days_until_deadline <= 90:
-							upcoming_scholarships.append(scholarship)
-						else:
-							future_scholarships.append(scholarship)
-					except (ValueError, TypeError, AttributeError) as e:
+						if isinstance(deadline, str):
+							deadline = date.fromisoformat(deadline[:10])
+						days_until_deadline = deadline.toordinal() - today_ordinal
+					except (ValueError, TypeError, AttributeError):
 						# If deadline parsing fails, add to future scholarships
 						scholarship["days_until_deadline"] = None
-						future_scholarships.append(scholarship)
+						add_future(scholarship)
+						continue
+					scholarship["days_until_deadline"] = days_until_deadline
+					bucket_appends[bisect_right(_DEADLINE_BUCKET_EDGES, days_until_deadline)](scholarship)
 				else:
 					scholarship["days_until_deadline"] = None
-					future_scholarships.append(scholarship)
+					add_future(scholarship)
 			
 			# Calculate summary statistics - keep award amounts as text
-			active_count = 0
-			
-			for s in scholarships:
-				# Count active scholarships
-				if s.get("days_until_deadline") is None or s.get("days_until_deadline", -1) >= 0:
-					active_count += 1
+			# Active = no deadline or deadline not yet passed, i.e. everything not expired
+			active_count = len(scholarships) - len(expired_scholarships)
 			
 			response_data = {
 				"user_profile_id": user_profile_id,
@@ -919,7 +1598,7 @@ def register_routes(app: Flask) -> None:
 					"active_scholarships": active_count,
 					"urgent_count": len(urgent_scholarships),
 					"note": "Award amounts displayed as text to preserve original format",
-					"categories": list(set(s.get("category") for s in scholarships if s.get("category")))
+					"categories": list(categories)
 				},
 				"recent_profile_changes": changes_resp.data or [],
 				"filters_applied": {
@@ -930,12 +1609,11 @@ def register_routes(app: Flask) -> None:
 				"disclaimer": "This system provides scholarship opportunity matching based on eligibility criteria. We cannot guarantee that users will win any scholarships."
 			}
 			
+			# Store a new mapping rather than mutating the one shared through the cache
+			scholarship_results_cache.set(user_profile_id, {**(cached_views or {}), view_key: response_data})
+			
 			# Return formatted JSON for better readability
-			return app.response_class(
-				response=json.dumps(response_data, indent=2, ensure_ascii=False),
-				status=HTTPStatus.OK,
-				mimetype='application/json'
-			)
+			return _json_response(response_data, HTTPStatus.OK)
 			
 		except Exception as exc:
 			return jsonify({"error": str(exc)}), HTTPStatus.INTERNAL_SERVER_ERROR
@@ -954,10 +1632,8 @@ def register_routes(app: Flask) -> None:
 		"""
 
 		# add logging
-		print("Visa info request received")
-		print(request.get_json())
-		print("=" * 60)
-		payload = request.get_json(silent=True) or {}
+		payload = _parse_body()
+		logger.debug("Visa info request received: %s", payload)
 		citizenship = payload.get("citizenship")
 		destination = payload.get("destination")
 		user_profile_id = payload.get("user_profile_id")
@@ -979,89 +1655,38 @@ def register_routes(app: Flask) -> None:
 			# Attempt to run Visa Agent if available
 			agent_used = False
 			try:
-				from agents.crew import SearchCrew
+				SearchCrew = _agent_crews().SearchCrew
 				crew = SearchCrew()
-				print("Crew created")
-				print("=" * 60)
 				# Use implemented visa search agent/task
 				visa_task_getter = getattr(crew, 'visa_search_task', None)
 				visa_agent_getter = getattr(crew, 'visa_search_agent', None)
 				if visa_task_getter and visa_agent_getter and refresh:
-					from crewai import Crew, Process
 					visa_task_obj = visa_task_getter()
 					visa_agent_obj = visa_agent_getter()
 					visa_crew = Crew(
 						agents=[visa_agent_obj],
 						tasks=[visa_task_obj],
 						process=Process.sequential,
-						verbose=True
+						verbose=_CREW_VERBOSE
 					)
 					inputs = {
 						'citizenship_country': citizenship,
 						'destination_country': destination,
 						'user_id': user_profile_id
 					}
-					print("Inputs:")
-					print(inputs)
-					print("=" * 60)
+					logger.debug("Visa agent inputs: %s", inputs)
 					result = visa_crew.kickoff(inputs=inputs)
 					agent_output = result.raw if hasattr(result, 'raw') else str(result)
 					# Extract JSON object or array from output
-					print("Agent output:")
-					print(agent_output)
-					print("=" * 60)
-					cleaned = agent_output.strip()
-					stored_rows = 0
+					logger.debug("Visa agent output: %s", agent_output)
 					try:
 						# Prefer array, else single object
-						start_idx = cleaned.find('[')
-						end_idx = cleaned.rfind(']')
-						if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
-							data = json.loads(cleaned[start_idx:end_idx + 1])
-						else:
-							brace_start = cleaned.find('{')
-							brace_end = cleaned.rfind('}')
-							data = json.loads(cleaned[brace_start:brace_end + 1])
-						# Normalize to list
-						if isinstance(data, dict):
-							data = [data]
+						data = _parse_visa_output(agent_output)
 						# Process each visa requirement with change detection
-						for item in data:
-							new_data = {
-								"visa_type": item.get("visa_type"),
-								"documents": item.get("required_documents"),
-								"process_steps": item.get("application_process"),
-								"fees": item.get("application_fees"),
-								"timelines": item.get("processing_time"),
-								"interview": item.get("interview_required"),
-								"post_graduation": item.get("post_graduation_options"),
-								"source_url": item.get("source_url"),
-								"disclaimer": item.get("disclaimer"),
-								"notes": item.get("notes", [])
-							}
-							
-							# Detect changes
-							change_info = _detect_visa_changes(supabase, citizenship, destination, user_profile_id, new_data)
-							
-							row = {
-								"user_profile_id": user_profile_id,
-								"citizenship_country": citizenship,
-								"destination_country": destination,
-								**new_data,
-								"fetched_at": item.get("fetched_at"),
-								"last_updated": item.get("last_updated") or item.get("fetched_at"),
-								"alert_sent": not change_info["alert_needed"],  # Set to True if no alert needed
-								"change_summary": change_info
-							}
-							
-							ins = supabase.table("visa_requirements").insert(row).execute()
-							if ins.data:
-								stored_rows += 1
-								print(f"Change detection: {change_info}")
+						stored_rows = _store_visa_requirements(supabase, citizenship, destination, user_profile_id, data)
 						
 						# Log agent report to agent_reports_log
-						from .agent_event_handler import get_event_handler
-						get_event_handler().log_agent_report(
+						_log_agent_report_async(
 							agent_name="Visa Agent",
 							user_id=user_profile_id,
 							payload={
@@ -1075,33 +1700,26 @@ def register_routes(app: Flask) -> None:
 						agent_used = True
 					except Exception:
 						# Fall back to cache only
+						logger.warning("Could not store visa agent output for user %s", user_profile_id, exc_info=True)
 						agent_used = False
 			except Exception as e:
-				print("Error creating crew")
-				print(e)
-				print("=" * 60)
+				logger.warning("Visa agent unavailable, returning cached data: %s", e)
 				# Agent infra not available; continue with cache
 				agent_used = False
 
 			# Return current cached data for the pair
-			print("Returning cached data")
-			print("=" * 60)
 			resp = supabase.table("visa_requirements").select("*") \
 				.eq("citizenship_country", citizenship) \
 				.eq("destination_country", destination) \
 				.eq("user_profile_id", user_profile_id) \
 				.order("last_updated", desc=True).limit(50).execute()
-			return app.response_class(
-				response=json.dumps({
-					"citizenship": citizenship,
-					"destination": destination,
-					"count": len(resp.data) if resp.data else 0,
-					"agent_refresh_attempted": agent_used and refresh,
-					"results": resp.data or []
-				}, indent=2, ensure_ascii=False),
-				status=HTTPStatus.OK,
-				mimetype='application/json'
-			)
+			return _json_response({
+				"citizenship": citizenship,
+				"destination": destination,
+				"count": len(resp.data) if resp.data else 0,
+				"agent_refresh_attempted": agent_used and refresh,
+				"results": resp.data or []
+			}, HTTPStatus.OK)
 		except Exception as exc:
 			return jsonify({"error": str(exc)}), HTTPStatus.INTERNAL_SERVER_ERROR
 
@@ -1118,74 +1736,35 @@ def register_routes(app: Flask) -> None:
 			if not user_profile_id:
 				return jsonify({"error": "user_profile_id is required"}), HTTPStatus.BAD_REQUEST
 			
-			# Validate user exists before proceeding
-			user_exists, error_response = _validate_user_exists(int(user_profile_id))
-			if not user_exists:
-				return jsonify(error_response), HTTPStatus.NOT_FOUND
-			
 			supabase = get_supabase()
 			refresh = request.args.get('refresh', 'false').lower() == 'true'
 			agent_used = False
 			if refresh:
+				# Don't start an agent run for a user that doesn't exist
+				user_exists, error_response = _validate_user_exists(int(user_profile_id))
+				if not user_exists:
+					return jsonify(error_response), HTTPStatus.NOT_FOUND
 				try:
-					from agents.crew import SearchCrew
+					SearchCrew = _agent_crews().SearchCrew
 					crew = SearchCrew()
 					visa_task_getter = getattr(crew, 'visa_search_task', None)
 					visa_agent_getter = getattr(crew, 'visa_search_agent', None)
 					if visa_task_getter and visa_agent_getter:
-						from crewai import Crew, Process
 						visa_task_obj = visa_task_getter()
 						visa_agent_obj = visa_agent_getter()
 						visa_crew = Crew(
 							agents=[visa_agent_obj],
 							tasks=[visa_task_obj],
 							process=Process.sequential,
-							verbose=True
+							verbose=_CREW_VERBOSE
 						)
 						result = visa_crew.kickoff(inputs={'citizenship_country': citizenship, 'destination_country': destination, 'user_id': user_profile_id})
 						agent_output = result.raw if hasattr(result, 'raw') else str(result)
-						print(agent_output)
-						cleaned = agent_output.strip()
+						logger.debug("Visa agent output: %s", agent_output)
 						try:
-							start_idx = cleaned.find('[')
-							end_idx = cleaned.rfind(']')
-							if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
-								data = json.loads(cleaned[start_idx:end_idx + 1])
-							else:
-								brace_start = cleaned.find('{')
-								brace_end = cleaned.rfind('}')
-								data = json.loads(cleaned[brace_start:brace_end + 1])
-							if isinstance(data, dict):
-								data = [data]
+							data = _parse_visa_output(agent_output)
 							# Process each visa requirement with change detection
-							for item in data:
-								new_data = {
-									"visa_type": item.get("visa_type"),
-									"documents": item.get("required_documents"),
-									"process_steps": item.get("application_process"),
-									"fees": item.get("application_fees"),
-									"timelines": item.get("processing_time"),
-									"interview": item.get("interview_required"),
-									"post_graduation": item.get("post_graduation_options"),
-									"source_url": item.get("source_url"),
-									"disclaimer": item.get("disclaimer"),
-									"notes": item.get("notes", [])
-								}
-								
-								# Detect changes
-								change_info = _detect_visa_changes(supabase, citizenship, destination, user_profile_id, new_data)
-								
-								row = {
-									"user_profile_id": user_profile_id,
-									"citizenship_country": citizenship,
-									"destination_country": destination,
-									**new_data,
-									"fetched_at": item.get("fetched_at"),
-									"last_updated": item.get("last_updated") or item.get("fetched_at"),
-									"alert_sent": not change_info["alert_needed"],  # Set to True if no alert needed
-									"change_summary": change_info
-								}
-								supabase.table("visa_requirements").insert(row).execute()
+							_store_visa_requirements(supabase, citizenship, destination, user_profile_id, data)
 							agent_used = True
 						except Exception:
 							agent_used = False
@@ -1197,17 +1776,19 @@ def register_routes(app: Flask) -> None:
 				.eq("destination_country", destination) \
 				.eq("user_profile_id", user_profile_id) \
 				.order("last_updated", desc=True).limit(50).execute()
-			return app.response_class(
-				response=json.dumps({
-					"citizenship": citizenship,
-					"destination": destination,
-					"count": len(resp.data) if resp.data else 0,
-					"agent_refresh_attempted": agent_used and refresh,
-					"results": resp.data or []
-				}, indent=2, ensure_ascii=False),
-				status=HTTPStatus.OK,
-				mimetype='application/json'
-			)
+			
+			# Rows can only exist for a valid user, so validate only on an empty result
+			if not resp.data and not refresh:
+				user_exists, error_response = _validate_user_exists(int(user_profile_id))
+				if not user_exists:
+					return jsonify(error_response), HTTPStatus.NOT_FOUND
+			return _json_response({
+				"citizenship": citizenship,
+				"destination": destination,
+				"count": len(resp.data) if resp.data else 0,
+				"agent_refresh_attempted": agent_used and refresh,
+				"results": resp.data or []
+			}, HTTPStatus.OK)
 		except Exception as exc:
 			return jsonify({"error": str(exc)}), HTTPStatus.INTERNAL_SERVER_ERROR
 
@@ -1229,11 +1810,6 @@ def register_routes(app: Flask) -> None:
 			if not user_profile_id:
 				return jsonify({"error": "user_profile_id is required"}), HTTPStatus.BAD_REQUEST
 			
-			# Validate user exists before proceeding
-			user_exists, error_response = _validate_user_exists(int(user_profile_id))
-			if not user_exists:
-				return jsonify(error_response), HTTPStatus.NOT_FOUND
-			
 			supabase = get_supabase()
 			
 			# Get latest visa requirements
@@ -1241,15 +1817,19 @@ def register_routes(app: Flask) -> None:
 				.eq("citizenship_country", citizenship) \
 				.eq("destination_country", destination) \
 				.eq("user_profile_id", user_profile_id) \
-				.order("last_updated", desc=True).limit(1).execute()
+				.order("last_updated", desc=True).limit(1).maybe_single().execute()
 			
-			if not resp.data:
+			if not resp:
+				# Only pay for the user lookup when there is nothing to return
+				user_exists, error_response = _validate_user_exists(int(user_profile_id))
+				if not user_exists:
+					return jsonify(error_response), HTTPStatus.NOT_FOUND
 				return jsonify({
 					"error": f"No visa requirements found for {citizenship} → {destination}",
 					"suggestion": "Try running a visa search first with: POST /visa_info"
 				}), HTTPStatus.NOT_FOUND
 			
-			visa_data = resp.data[0]
+			visa_data = resp.data
 			
 			# Generate user-friendly report
 			report = _generate_visa_report(visa_data, citizenship, destination)
@@ -1278,8 +1858,6 @@ def register_routes(app: Flask) -> None:
 		- user_profile_id: required
 		- limit: optional (default: 50)
 		"""
-		print("Getting visa alerts for user request:")
-		print("=" * 60)	
 		try:
 			user_profile_id = request.args.get('user_profile_id')
 			limit = int(request.args.get('limit', '50'))
@@ -1287,41 +1865,37 @@ def register_routes(app: Flask) -> None:
 			if not user_profile_id:
 				return jsonify({"error": "user_profile_id is required"}), HTTPStatus.BAD_REQUEST
 			
-			# Validate user exists before proceeding
-			user_exists, error_response = _validate_user_exists(int(user_profile_id))
-			if not user_exists:
-				return jsonify(error_response), HTTPStatus.NOT_FOUND
-			
 			supabase = get_supabase()
 			
-			# Get visa requirements with pending alerts
-			resp = supabase.table("visa_requirements").select("*") \
+			# Get visa requirements with pending alerts (only the columns the alert payload uses);
+			# alert_needed is matched in the database so only real alerts count toward the limit
+			resp = supabase.table("visa_requirements") \
+				.select("id, citizenship_country, destination_country, visa_type, last_updated, source_url, change_summary") \
 				.eq("user_profile_id", user_profile_id) \
 				.eq("alert_sent", False) \
+				.eq("change_summary->>alert_needed", "true") \
 				.order("last_updated", desc=True).limit(limit).execute()
-			print("Last alert:")
-			if resp.data:
-				print(resp.data[-1])
-			else:
-				print("No visa requirements found")
-			print("=" * 60)
+			
+			# Rows can only exist for a valid user, so validate only on an empty result
+			if not resp.data:
+				user_exists, error_response = _validate_user_exists(int(user_profile_id))
+				if not user_exists:
+					return jsonify(error_response), HTTPStatus.NOT_FOUND
+			logger.debug("Visa alerts for user %s: %d pending rows", user_profile_id, len(resp.data or []))
 			alerts = []
 			for req in resp.data or []:
-				if not req['change_summary']:
-					continue
-				change_summary = req.get("change_summary", {})
-				if change_summary.get("alert_needed", False):
-					alerts.append({
-						"id": req["id"],
-						"citizenship": req["citizenship_country"],
-						"destination": req["destination_country"],
-						"visa_type": req["visa_type"],
-						"last_updated": req["last_updated"],
-						"source_url": req["source_url"],
-						"changes": change_summary.get("changes", []),
-						"is_new": change_summary.get("is_new", False),
-						"alert_message": f"Visa requirements updated for {req['citizenship_country']} → {req['destination_country']}"
-					})
+				change_summary = req["change_summary"]
+				alerts.append({
+					"id": req["id"],
+					"citizenship": req["citizenship_country"],
+					"destination": req["destination_country"],
+					"visa_type": req["visa_type"],
+					"last_updated": req["last_updated"],
+					"source_url": req["source_url"],
+					"changes": change_summary.get("changes", []),
+					"is_new": change_summary.get("is_new", False),
+					"alert_message": f"Visa requirements updated for {req['citizenship_country']} → {req['destination_country']}"
+				})
 			
 			return jsonify({
 				"user_profile_id": user_profile_id,
@@ -1346,18 +1920,13 @@ def register_routes(app: Flask) -> None:
 		}
 		"""
 		try:
-			payload = request.get_json(silent=True) or {}
+			payload = _parse_body()
 			user_profile_id = payload.get("user_profile_id")
 			alert_ids = payload.get("alert_ids", [])
 			
 			if not user_profile_id:
 				return jsonify({"error": "user_profile_id is required"}), HTTPStatus.BAD_REQUEST
 			
-			# Validate user exists before proceeding
-			user_exists, error_response = _validate_user_exists(user_profile_id)
-			if not user_exists:
-				return jsonify(error_response), HTTPStatus.NOT_FOUND
-			
 			supabase = get_supabase()
 			
 			# Build update query
@@ -1368,12 +1937,21 @@ def register_routes(app: Flask) -> None:
 			if alert_ids:
 				query = query.in_("id", alert_ids)
 			
+			# Keeps the default return=representation: with return=minimal the client
+			# library discards the Content-Range count along with the empty body
 			result = query.execute()
+			updated_count = len(result.data or [])
+			
+			# The update is scoped to the user's rows, so only check the user when nothing matched
+			if not updated_count:
+				user_exists, error_response = _validate_user_exists(user_profile_id)
+				if not user_exists:
+					return jsonify(error_response), HTTPStatus.NOT_FOUND
 			
 			return jsonify({
-				"message": f"Marked {len(result.data)} alerts as sent",
+				"message": f"Marked {updated_count} alerts as sent",
 				"user_profile_id": user_profile_id,
-				"updated_count": len(result.data)
+				"updated_count": updated_count
 			}), HTTPStatus.OK
 			
 		except Exception as exc:
@@ -1393,10 +1971,11 @@ def register_routes(app: Flask) -> None:
 		Body: {
 			"user_profile_id": "required",
 			"university": "optional - specific university to fetch",
-			"program": "optional - specific program to fetch"
+			"program": "optional - specific program to fetch",
+			"async": "optional - true to run in the background and poll /jobs/<job_id>"
 		}
 		"""
-		payload = request.get_json(silent=True) or {}
+		payload = _parse_body()
 		user_profile_id = payload.get("user_profile_id")
 		university = payload.get("university")
 		program = payload.get("program")
@@ -1409,168 +1988,29 @@ def register_routes(app: Flask) -> None:
 		try:
 			supabase = get_supabase()
 			
-			# Verify user profile exists
-			profile_resp = supabase.table("user_profile").select("*").eq("id", user_profile_id).execute()
-			if not profile_resp.data:
-				return jsonify({"error": f"User profile {user_profile_id} not found"}), HTTPStatus.NOT_FOUND
-
-			# Sync provided university/program into user's profile if present
-			if university and program:
-				try:
-					update_payload = {
-						"university_interests": json.dumps([university]),
-						"intended_major": program
-					}
-					supabase.table("user_profile").update(update_payload).eq("id", user_profile_id).execute()
-					print(f"[DEBUG] Updated user_profile {user_profile_id} with latest university/program "
-						f"({university} - {program}) for agent context.")
-				except Exception as e:
-					print(f"[WARN] Failed to update user_profile before agent run: {e}")
-			
+			# Sync the university/program into the profile the agent reads. The update
+			# returns the row, so it doubles as the existence check (no separate SELECT).
 			try:
-				from agents.crew import SearchCrew
-				crew = SearchCrew()
-				
-				app_req_task = crew.application_requirement_task()
-				app_req_agent = crew.application_requirement_agent()
-
-				print("[DEBUG] Creating application requirement crew...")
-				# Create a crew with just the application requirement agent and task
-				from crewai import Crew, Process
-				application_requirement_crew = Crew(
-					agents=[app_req_agent],
-					tasks=[app_req_task],
-					process=Process.sequential,
-					verbose=True
-				)
-
-				# Specific University Flow (only flow since all fields are required)
-				inputs = {
-					"user_id": user_profile_id,
-					"university": university,
-					"program": program,
-					"search_type": "specific"
-				}
-				result = application_requirement_crew.kickoff(inputs=inputs)
-
-				requirements_data = []
-				formatted_json = None
-				formatted_markdown = None
-
-				# Parse agent output
-				if hasattr(result, 'raw'):
-					agent_output = result.raw
-				else:
-					agent_output = str(result)
-
-				# Parse and store each requirement
-				try:
-					cleaned_output = agent_output.strip()
-
-					# Try to extract JSON from text (handles cases where model outputs explanations or markdown)
-					match = re.search(r'\{[\s\S]*\}', cleaned_output)
-					if not match:
-						print("[WARN] No valid JSON object found in agent output.")
-						data = []
-					else:
-						json_text = match.group(0)
-
-						# Clean up JSON text more carefully
-						normalized_json = json_text.strip()
-						
-						# Remove any stray commas before closing brackets
-						normalized_json = re.sub(r',(\s*[\]}])', r'\1', normalized_json)
-						
-						# Fix common JSON issues
-						normalized_json = re.sub(r',\s*}', '}', normalized_json)  # Remove trailing commas
-						normalized_json = re.sub(r',\s*]', ']', normalized_json)  # Remove trailing commas
-
-						try:
-							data = json.loads(normalized_json)
-						except json.JSONDecodeError as err:
-							print(f"[WARN] JSON decode failed after normalization: {err}")
-							print("[DEBUG] Raw extracted text:\n", json_text)
-							print("[DEBUG] Normalized text:\n", normalized_json)
-							data = []
-
-					if isinstance(data, dict):
-						data = [data]  # Convert single result to list
-						
-					for req in data:
-						# Format each requirement using checklist_formatter
-						formatted_json = to_json_with_labels(req)
-						formatted_markdown = to_markdown(req)
-						
-						# Structure according to application_requirements table schema
-						requirement_data = {
-							"user_profile_id": user_profile_id,
-							"university": req.get("university"),
-							"program": req.get("program"),
-							"application_platform": req.get("application_platform"),
-							"deadlines": req.get("deadlines", {}),
-							"required_documents": req.get("required_documents", []),
-							"essay_prompts": req.get("essay_prompts", {}),
-							"portfolio_required": req.get("portfolio_required", False),
-							"interview": req.get("interview"),
-							"fee_info": req.get("fee_info", {}),
-							"test_policy": req.get("test_policy"),
-							"source_url": req.get("source_url"),
-							"fetched_at": datetime.now().isoformat(),
-							"is_ambiguous": req.get("is_ambiguous", False),
-							"reviewed_by": req.get("reviewed_by")
-						}
-
-						requirements_data.append(requirement_data)
-
-						# Check if an entry already exists in the database
-						existing_entry_resp = supabase.table("application_requirements").select("id").eq("user_profile_id", user_profile_id).eq("university", req.get("university")).eq("program", req.get("program")).execute()
-
-						if existing_entry_resp.data:
-							# Update the existing entry
-							existing_entry_id = existing_entry_resp.data[0]["id"]
-							supabase.table("application_requirements").update(requirement_data).eq("id", existing_entry_id).execute()
-						else:
-							# Insert a new record
-							supabase.table("application_requirements").insert(requirement_data).execute()
-
-				except Exception as e:
-					print(f"[ERROR] Failed to process result: {str(e)}")
-					return jsonify({"error": str(e)}), HTTPStatus.INTERNAL_SERVER_ERROR
-
-				# Log agent report to agent_reports_log
-				try:
-					from .agent_event_handler import get_event_handler
-					get_event_handler().log_agent_report(
-						agent_name="Application Requirements Agent",
-						user_id=user_profile_id,
-						payload={
-							"application_requirements_stored": len(data) if isinstance(data, list) else 1,
-							"university": university,
-							"program": program,
-							"stored_at": datetime.now().isoformat()
-						}
-					)
-				except Exception as log_error:
-					print(f"[WARN] Failed to log agent report: {log_error}")
-
-				response = {
-					"message": "Application requirements fetched and stored successfully",
-					"user_profile_id": user_profile_id,
-					"search_type": "specific",
-					"formatted_json": formatted_json,
-					"formatted_markdown": formatted_markdown,
-					"disclaimer": "All information is sourced from the official university website. Please verify before submitting your application."
-				}
-
-				return app.response_class(
-					response=json.dumps(response, indent=2, ensure_ascii=False),
-					status=HTTPStatus.OK,
-					mimetype='application/json'
-				)
-
+				updated = supabase.table("user_profile").update({
+					"university_interests": [university],
+					"intended_major": program
+				}).eq("id", user_profile_id).execute()
+				profile = updated.data[0] if updated.data else None
+				g.setdefault("user_profile_cache", {})[user_profile_id] = profile
+				logger.debug("Updated user_profile %s with %s - %s for agent context", user_profile_id, university, program)
 			except Exception as e:
-				print(f"[ERROR] Exception in /fetch_application_requirements: {str(e)}")
-				return jsonify({"error": str(e)}), HTTPStatus.INTERNAL_SERVER_ERROR
+				logger.warning("Failed to update user_profile before agent run: %s", e)
+				profile = _get_user_profile(user_profile_id)
+			
+			if not profile:
+				return jsonify({"error": f"User profile {user_profile_id} not found"}), HTTPStatus.NOT_FOUND
+			
+			# Run in the background when requested; poll /jobs/<job_id> for the outcome
+			if _async_requested(payload):
+				return _start_agent_job("application_requirements", _run_application_requirements, supabase, user_profile_id, university, program)
+			
+			body, status = _run_application_requirements(supabase, user_profile_id, university, program)
+			return _json_response(body, status)
 		
 		except Exception as exc:
 			return jsonify({"error": str(exc)}), HTTPStatus.INTERNAL_SERVER_ERROR
@@ -1589,29 +2029,36 @@ def register_routes(app: Flask) -> None:
 				return jsonify({"error": "'user_profile_id' is required as a query parameter."}), HTTPStatus.BAD_REQUEST
 
 			supabase = get_supabase()
-			query = supabase.table("application_requirements").select("*").eq("user_profile_id", user_profile_id)
-			if university:
-				query = query.eq("university", university)
-			if program:
-				query = query.eq("program", program)
-			resp = query.order("fetched_at", desc=True).limit(1).execute()
+			# Rows only change on POST /fetch_application_requirements or a stale refresh,
+			# both of which drop the user's cached entries
+			cached_rows = application_requirements_cache.get(str(user_profile_id))
+			requirements = cached_rows.get((university, program)) if cached_rows is not None else None
+			if requirements is None:
+				query = supabase.table("application_requirements").select(_APPLICATION_REQUIREMENT_COLUMNS).eq("user_profile_id", user_profile_id)
+				if university:
+					query = query.eq("university", university)
+				if program:
+					query = query.eq("program", program)
+				resp = query.order("fetched_at", desc=True).limit(1).maybe_single().execute()
+				requirements = resp.data if resp else None
+				if requirements is not None:
+					# Store a new mapping rather than mutating the one shared through the cache
+					application_requirements_cache.set(
+						str(user_profile_id),
+						{**(cached_rows or {}), (university, program): requirements}
+					)
 
 			# If no data, return message indicating no application requirements fetched
-			if not resp.data:
-				return app.response_class(
-					response=json.dumps({
-						"message": f"No application requirements fetched for user_profile_id={user_profile_id}, university={university}, program={program}",
-						"user_profile_id": user_profile_id,
-						"university": university,
-						"program": program,
-						"requirements": [],
-						"refreshed": False
-					}, indent=2, ensure_ascii=False),
-					status=HTTPStatus.NOT_FOUND,
-					mimetype='application/json'
-				)
+			if requirements is None:
+				return _json_response({
+					"message": f"No application requirements fetched for user_profile_id={user_profile_id}, university={university}, program={program}",
+					"user_profile_id": user_profile_id,
+					"university": university,
+					"program": program,
+					"requirements": [],
+					"refreshed": False
+				}, HTTPStatus.NOT_FOUND)
 
-			requirements = resp.data[0]
 			fetched_at_str = requirements.get("fetched_at")
 			is_stale = False
 			if fetched_at_str:
@@ -1624,7 +2071,7 @@ def register_routes(app: Flask) -> None:
 
 			if is_stale:
 				try:
-					from agents.crew import SearchCrew
+					SearchCrew = _agent_crews().SearchCrew
 					crew = SearchCrew()
 					req_agent = crew.application_requirement_agent()
 					result = req_agent.get_requirements(
@@ -1646,63 +2093,52 @@ def register_routes(app: Flask) -> None:
 						"is_ambiguous": result.get("is_ambiguous", False),
 						"reviewed_by": result.get("reviewed_by")
 					}
+					# university and program are path parameters, so this targets the one stored checklist
 					supabase.table("application_requirements") \
 						.update(update_data) \
-						.eq("user_profile_id", user_profile_id)
-					if university:
-						supabase.table("application_requirements").update(update_data).eq("user_profile_id", user_profile_id).eq("university", university)
-					if program:
-						supabase.table("application_requirements").update(update_data).eq("user_profile_id", user_profile_id).eq("program", program)
+						.eq("user_profile_id", user_profile_id) \
+						.eq("university", university) \
+						.eq("program", program) \
+						.execute()
+					application_requirements_cache.pop(str(user_profile_id))
 					
 					# Log agent report to agent_reports_log
-					try:
-						from .agent_event_handler import get_event_handler
-						get_event_handler().log_agent_report(
-							agent_name="Application Requirements Agent",
-							user_id=user_profile_id,
-							payload={
-								"application_requirements_stored": 1,
-								"university": university,
-								"program": program,
-								"refreshed": True,
-								"stored_at": datetime.now().isoformat()
-							}
-						)
-					except Exception as log_error:
-						print(f"[WARN] Failed to log agent report: {log_error}")
-					
-					# Return the newly refreshed requirements
-					refreshed_requirements = requirements.copy()
-					refreshed_requirements.update(update_data)
-					return app.response_class(
-						response=json.dumps({
-							"user_profile_id": user_profile_id,
+					_log_agent_report_async(
+						agent_name="Application Requirements Agent",
+						user_id=user_profile_id,
+						payload={
+							"application_requirements_stored": 1,
 							"university": university,
 							"program": program,
-							"requirements": refreshed_requirements,
 							"refreshed": True,
-							"note": "Auto-refreshed because data was older than 30 days."
-						}, indent=2, ensure_ascii=False),
-						status=HTTPStatus.OK,
-						mimetype='application/json'
+							"stored_at": datetime.now().isoformat()
+						}
 					)
+					
+					# Return the newly refreshed requirements
+					refreshed_requirements = requirements.copy()
+					refreshed_requirements.update(update_data)
+					return _json_response({
+						"user_profile_id": user_profile_id,
+						"university": university,
+						"program": program,
+						"requirements": refreshed_requirements,
+						"refreshed": True,
+						"note": "Auto-refreshed because data was older than 30 days."
+					}, HTTPStatus.OK)
 				except ImportError:
 					return jsonify({"error": "Application Requirements Agent not available."}), HTTPStatus.SERVICE_UNAVAILABLE
 				except Exception as exc:
 					return jsonify({"error": str(exc)}), HTTPStatus.INTERNAL_SERVER_ERROR
 
 			# Otherwise, return the latest requirements
-			return app.response_class(
-				response=json.dumps({
-					"user_profile_id": user_profile_id,
-					"university": university,
-					"program": program,
-					"requirements": requirements,
-					"refreshed": False
-				}, indent=2, ensure_ascii=False),
-				status=HTTPStatus.OK,
-				mimetype='application/json'
-			)
+			return _json_response({
+				"user_profile_id": user_profile_id,
+				"university": university,
+				"program": program,
+				"requirements": requirements,
+				"refreshed": False
+			}, HTTPStatus.OK)
 		except Exception as exc:
 			return jsonify({"error": str(exc)}), HTTPStatus.INTERNAL_SERVER_ERROR
 
@@ -1718,6 +2154,7 @@ def register_routes(app: Flask) -> None:
 		Uses the Admissions Counselor Agent to synthesize data from all agents.
 		
 		GET /admissions/summary/{user_id}
+		Query: async=true to run in the background and poll /jobs/<job_id>
 		"""
 		try:
 			# Validate user exists
@@ -1725,137 +2162,12 @@ def register_routes(app: Flask) -> None:
 			if not user_exists:
 				return jsonify(error_response), HTTPStatus.NOT_FOUND
 			
-			supabase = get_supabase()
-			
-			# Execute Admissions Counselor Agent with HIERARCHICAL ORCHESTRATION
-			try:
-				from agents.crew import ManagerCrew
-				
-				# Use ManagerCrew which has hierarchical process built-in
-				manager_crew_instance = ManagerCrew()
-				
-				print(f"\n=== DEBUG: Using ManagerCrew for Hierarchical Delegation ===")
-				print(f"Using ManagerCrew with hierarchical process")
-				print(f"========================================================\n")
-				
-				# Get the crew instance (ready to use with hierarchical process)
-				admissions_crew = manager_crew_instance.crew()
-				
-				inputs = {
-					'user_id': user_id,
-					'current_year': str(datetime.now().year),
-					'next_year': str(datetime.now().year + 1),
-					'today': datetime.now().date().isoformat(),  # Provide current date for deadline calculations
-					'search_type': 'full',  # For scholarship_search_task
-					# Profile data (citizenship_country, destination_country, university, program) will be read by agents from user profile
-					# Do not pass empty strings - agents use ProfileQueryTool/ProfileAccessTool to get this data
-				}
-				
-				print(f"\nSTARTING ADMISSIONS COUNSELOR AGENT - User ID: {user_id}")
-				print(f"Inputs: {inputs}")
-				print("=" * 60)
-				
-				result = admissions_crew.kickoff(inputs=inputs)
-				agent_output = result.raw if hasattr(result, 'raw') else str(result)
-				
-				print(f"\nADMISSIONS COUNSELOR OUTPUT:")
-				print("=" * 60)
-				print(agent_output)
-				print("=" * 60)
-				
-				# Parse agent output
-				cleaned_output = agent_output.strip()
-				start_idx = cleaned_output.find('{')
-				end_idx = cleaned_output.rfind('}')
-				
-				if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
-					json_content = cleaned_output[start_idx:end_idx + 1]
-					try:
-						summary_data = json.loads(json_content)
-						print(f"✅ Parsed agent output successfully")
-					except json.JSONDecodeError as e:
-						print(f"⚠️ Could not parse agent output as JSON: {e}")
-						summary_data = None
-				else:
-					print(f"⚠️ No JSON object found in agent output")
-					summary_data = None
-				
-			except ImportError:
-				print("⚠️ CrewAI agents not available, falling back to direct calculation")
-				summary_data = None
-			except Exception as e:
-				print(f"⚠️ Agent execution failed: {e}")
-				summary_data = None
-			
-			# Fallback: try to return cached summary if agent failed
-			if summary_data is None:
-				print("⚠️ Agent failed, attempting to return cached summary")
-				
-				# Try to get cached summary from DB
-				cached_summary = supabase.table("admissions_summary").select("*").eq("user_id", user_id).order("last_updated", desc=True).limit(1).execute()
-				
-				if cached_summary.data:
-					# Return cached summary
-					summary_data = cached_summary.data[0]
-				else:
-					# Return basic structure if no cache
-					summary_data = {
-						"current_stage": "Getting Started",
-						"progress_score": 0,
-						"active_agents": [],
-						"stress_flags": {"incomplete_profile": True, "approaching_deadlines": 0, "agent_conflicts": False},
-						"next_steps": [],
-						"overview": {"universities_found": 0, "scholarships_found": 0, "application_requirements": 0, "visa_info_count": 0},
-						"advice": ""
-					}
-				
-				# If no cached summary, add empty overview to basic structure
-				if not summary_data.get("overview"):
-					summary_data["overview"] = {"universities_found": 0, "scholarships_found": 0, "application_requirements": 0, "visa_info_count": 0}
-			else:
-				# Agent provided output - use it, save to database, and add overview data
-				supabase = get_supabase()
-				universities_resp = supabase.table("university_results").select("id").eq("user_profile_id", user_id).execute()
-				scholarships_resp = supabase.table("scholarship_results").select("id").eq("user_profile_id", user_id).gte("deadline", datetime.now().date().isoformat()).execute()
-				app_reqs_resp = supabase.table("application_requirements").select("id").eq("user_profile_id", user_id).execute()
-				visa_resp = supabase.table("visa_requirements").select("id").eq("user_profile_id", user_id).execute()
-				profile_resp = supabase.table("user_profile").select("full_name").eq("id", user_id).execute()
-				
-				summary_data["overview"] = {
-					"universities_found": len(universities_resp.data) if universities_resp.data else 0,
-					"scholarships_found": len(scholarships_resp.data) if scholarships_resp.data else 0,
-					"application_requirements": len(app_reqs_resp.data) if app_reqs_resp.data else 0,
-					"visa_info_count": len(visa_resp.data) if visa_resp.data else 0,
-					"profile_name": profile_resp.data[0]["full_name"] if profile_resp.data and len(profile_resp.data) > 0 else None
-				}
-				
-				# Save or update admissions_summary in database
-				summary_resp = supabase.table("admissions_summary").select("*").eq("user_id", user_id).order("last_updated", desc=True).limit(1).execute()
-				summary_data_db = summary_resp.data[0] if summary_resp.data else None
-				
-				db_data = {
-					"user_id": user_id,
-					"current_stage": summary_data.get("current_stage"),
-					"progress_score": summary_data.get("progress_score"),
-					"active_agents": summary_data.get("active_agents", []),
-					"stress_flags": summary_data.get("stress_flags", {}),
-					"next_steps": summary_data.get("next_steps", []),
-					"advice": summary_data.get("advice", ""),
-					"last_updated": datetime.now().isoformat()
-				}
-				
-				if not summary_data_db:
-					# Create new summary
-					supabase.table("admissions_summary").insert(db_data).execute()
-				else:
-					# Update existing summary
-					supabase.table("admissions_summary").update(db_data).eq("id", summary_data_db["id"]).execute()
+			# Run in the background when requested; poll /jobs/<job_id> for the outcome
+			if _async_requested():
+				return _start_agent_job("admissions_summary", _run_admissions_summary, user_id)
 			
-			return app.response_class(
-				response=json.dumps(summary_data, indent=2, ensure_ascii=False, default=str),
-				status=HTTPStatus.OK,
-				mimetype='application/json'
-			)
+			body, status = _run_admissions_summary(user_id)
+			return _json_response(body, status, default=str)
 			
 		except Exception as exc:
 			return jsonify({"error": str(exc)}), HTTPStatus.INTERNAL_SERVER_ERROR
@@ -1868,6 +2180,7 @@ def register_routes(app: Flask) -> None:
 		Updates the admissions_summary table with the generated next steps.
 		
 		GET /admissions/next_steps/{user_id}
+		Query: async=true to run in the background and poll /jobs/<job_id>
 		"""
 		try:
 			# Validate user exists
@@ -1875,99 +2188,35 @@ def register_routes(app: Flask) -> None:
 			if not user_exists:
 				return jsonify(error_response), HTTPStatus.NOT_FOUND
 			
-			supabase = get_supabase()
+			# Run in the background when requested; poll /jobs/<job_id> for the outcome
+			if _async_requested():
+				return _start_agent_job("admissions_next_steps", _run_next_steps, user_id)
 			
-			# Execute Next Steps Generator Agent using SearchCrew
-			try:
-				from agents.crew import SearchCrew
-				from crewai import Crew, Process
-				
-				# Create SearchCrew instance
-				search_crew_instance = SearchCrew()
-				
-				# Get the next_steps_generator_agent and next_steps_generator_task
-				next_steps_agent = search_crew_instance.next_steps_generator_agent()
-				next_steps_task = search_crew_instance.next_steps_generator_task()
-				
-				# Create crew with just the Next Steps Generator Agent and Task
-				next_steps_crew = Crew(
-					agents=[next_steps_agent],
-					tasks=[next_steps_task],
-					process=Process.sequential,
-					verbose=True
-				)
-				
-				inputs = {
-					'user_id': user_id,
-					'current_year': str(datetime.now().year),
-					'next_year': str(datetime.now().year + 1),
-					'today': datetime.now().date().isoformat()
-				}
-				
-				print(f"\n=== GENERATING NEXT STEPS - User ID: {user_id} ===")
-				result = next_steps_crew.kickoff(inputs=inputs)
-				agent_output = result.raw if hasattr(result, 'raw') else str(result)
-				
-				print(f"\nNEXT STEPS GENERATOR OUTPUT:")
-				print("=" * 60)
-				print(agent_output)
-				print("=" * 60)
-				
-				# Parse agent output - extract JSON array
-				cleaned_output = agent_output.strip()
-				start_idx = cleaned_output.find('[')
-				end_idx = cleaned_output.rfind(']')
-				
-				if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
-					json_content = cleaned_output[start_idx:end_idx + 1]
-					try:
-						next_steps = json.loads(json_content)
-						print(f"✅ Parsed next steps successfully: {len(next_steps)} steps")
-					except json.JSONDecodeError as e:
-						print(f"⚠️ Could not parse agent output as JSON: {e}")
-						next_steps = []
-				else:
-					print(f"⚠️ No JSON array found in agent output")
-					next_steps = []
-					
-			except ImportError:
-				print("⚠️ CrewAI agents not available, falling back to empty next steps")
-				next_steps = []
-			except Exception as e:
-				print(f"⚠️ Next Steps Generator Agent execution failed: {e}")
-				next_steps = []
-			
-			# Update admissions_summary table with generated next steps
-			summary_resp = supabase.table("admissions_summary").select("*").eq("user_id", user_id).order("last_updated", desc=True).limit(1).execute()
-			
-			if summary_resp.data:
-				# Update existing summary
-				supabase.table("admissions_summary").update({
-					"next_steps": next_steps,
-					"last_updated": datetime.now().isoformat()
-				}).eq("id", summary_resp.data[0]["id"]).execute()
-			else:
-				# Create new summary entry if it doesn't exist
-				supabase.table("admissions_summary").insert({
-					"user_id": user_id,
-					"next_steps": next_steps,
-					"last_updated": datetime.now().isoformat()
-				}).execute()
-			
-			return app.response_class(
-				response=json.dumps({
-					"user_id": user_id,
-					"next_steps": next_steps,
-					"total_count": len(next_steps),
-					"last_updated": datetime.now().isoformat()
-				}, indent=2, ensure_ascii=False, default=str),
-				status=HTTPStatus.OK,
-				mimetype='application/json'
-			)
+			body, status = _run_next_steps(user_id)
+			return _json_response(body, status, default=str)
 			
 		except Exception as exc:
 			return jsonify({"error": str(exc)}), HTTPStatus.INTERNAL_SERVER_ERROR
 	
+	@app.get("/jobs/<string:job_id>")
+	@require_auth
+	def get_job_status(job_id: str):
+		"""
+		Poll a background agent run started with "async": true (or ?async=true) on
+		/fetch_application_requirements, /admissions/summary or /admissions/next_steps.
+
+		GET /jobs/{job_id}
+		Headers: Authorization: Bearer <supabase_jwt_token>
+
+		Returns: status ("running", "completed" or "failed") and, once finished,
+		the same body the synchronous endpoint returns
+		"""
+		job = _agent_jobs.get(job_id)
+		if not job:
+			# Jobs live in this process only; a restart or another worker won't know the id
+			return jsonify({"error": f"Job {job_id} not found", "job_id": job_id}), HTTPStatus.NOT_FOUND
+		return _json_response({"job_id": job_id, **job}, HTTPStatus.OK, default=str)
+	
 	@app.post("/admissions/update_stage")
 	@require_auth
 	def update_admissions_stage():
@@ -1984,22 +2233,16 @@ def register_routes(app: Flask) -> None:
 		}
 		"""
 		try:
-			payload = request.get_json(silent=True) or {}
+			payload = _parse_body()
 			user_id = payload.get("user_id")
 			
 			if not user_id:
 				return jsonify({"error": "user_id is required"}), HTTPStatus.BAD_REQUEST
 			
-			# Validate user exists
-			user_exists, error_response = _validate_user_exists(user_id)
-			if not user_exists:
-				return jsonify(error_response), HTTPStatus.NOT_FOUND
-			
+			# No up-front user lookup: an update can only match an existing user's row,
+			# and the insert is guarded by the foreign key to user_profile
 			supabase = get_supabase()
 			
-			# Get or create summary
-			summary_resp = supabase.table("admissions_summary").select("*").eq("user_id", user_id).order("last_updated", desc=True).limit(1).execute()
-			
 			update_data = {
 				"last_updated": datetime.now().isoformat()
 			}
@@ -2014,27 +2257,39 @@ def register_routes(app: Flask) -> None:
 			if "next_steps" in payload:
 				update_data["next_steps"] = payload.get("next_steps")
 			
-			if summary_resp.data:
-				# Update existing
-				result = supabase.table("admissions_summary").update(update_data).eq("id", summary_resp.data[0]["id"]).execute()
-				return jsonify({
-					"message": "Admissions stage updated",
-					"user_id": user_id,
-					"updated_data": result.data[0] if result.data else {}
-				}), HTTPStatus.OK
-			else:
+			# Update the user's summary row directly (user_id is unique); only create
+			# one when nothing matched, so the common case is a single round trip.
+			# A plain upsert would reset current_stage/progress_score to the creation
+			# defaults, so the insert is used only for the first row.
+			result = supabase.table("admissions_summary").update(update_data).eq("user_id", user_id).execute()
+			if not result.data:
 				# Create new
-				update_data["user_id"] = user_id
-				if "current_stage" not in update_data:
-					update_data["current_stage"] = "Getting Started"
-				if "progress_score" not in update_data:
-					update_data["progress_score"] = 0.0
-				result = supabase.table("admissions_summary").insert(update_data).execute()
-				return jsonify({
-					"message": "Admissions summary created",
+				insert_data = {
 					"user_id": user_id,
-					"summary_data": result.data[0] if result.data else {}
-				}), HTTPStatus.CREATED
+					"current_stage": "Getting Started",
+					"progress_score": 0.0,
+					**update_data
+				}
+				try:
+					result = supabase.table("admissions_summary").insert(insert_data).execute()
+				except APIError as insert_error:
+					if insert_error.code == "23503":  # foreign_key_violation
+						return jsonify(_user_not_found_error(user_id)), HTTPStatus.NOT_FOUND
+					if insert_error.code != "23505":  # unique_violation: a concurrent call created it
+						raise
+					result = supabase.table("admissions_summary").update(update_data).eq("user_id", user_id).execute()
+				else:
+					return jsonify({
+						"message": "Admissions summary created",
+						"user_id": user_id,
+						"summary_data": result.data[0] if result.data else {}
+					}), HTTPStatus.CREATED
+			
+			return jsonify({
+				"message": "Admissions stage updated",
+				"user_id": user_id,
+				"updated_data": result.data[0] if result.data else update_data
+			}), HTTPStatus.OK
 			
 		except Exception as exc:
 			return jsonify({"error": str(exc)}), HTTPStatus.INTERNAL_SERVER_ERROR
@@ -2055,7 +2310,7 @@ def register_routes(app: Flask) -> None:
 		}
 		"""
 		try:
-			payload = request.get_json(silent=True) or {}
+			payload = _parse_body()
 			agent_name = payload.get("agent_name")
 			user_id = payload.get("user_id")
 			report_payload = payload.get("payload", {})
@@ -2069,7 +2324,6 @@ def register_routes(app: Flask) -> None:
 				return jsonify(error_response), HTTPStatus.NOT_FOUND
 			
 			# Use event handler to log report
-			from .agent_event_handler import get_event_handler
 			handler = get_event_handler()
 			result = handler.log_agent_report(
 				agent_name=agent_name,
@@ -2107,41 +2361,35 @@ def register_routes(app: Flask) -> None:
 			"program": "Data Science B.S.",
 			"details": {"note": "Ambiguity detected in test policy"}
 		}
+		
+		Returns 202 right away; when COUNSELOR_WEBHOOK_URL is set the notification
+		is forwarded in the background ("webhook_dispatched": true once queued).
 		"""
 		try:
-			payload = request.get_json(silent=True) or {}
+			payload = _parse_body()
 			event_type = payload.get("event_type")
 			user_profile_id = payload.get("user_profile_id")
 			if not event_type or not user_profile_id:
 				return jsonify({"error": "'event_type' and 'user_profile_id' are required"}), HTTPStatus.BAD_REQUEST
 
 
-			# Optional outbound webhook dispatch
+			# Optional outbound webhook dispatch, off the request thread so a slow
+			# receiver can't hold the response for the full timeout; the webhook worker
+			# is kept off the request-path I/O pool
 			webhook_dispatched = False
-			try:
-				webhook_url = os.getenv("COUNSELOR_WEBHOOK_URL")
-				if webhook_url:
-					resp = requests.post(webhook_url, json=payload, timeout=5)
-					webhook_dispatched = (200 <= resp.status_code < 300)
-			except Exception:
-				webhook_dispatched = False
-
-			return app.response_class(
-				response=json.dumps({
-					"message": "Notification received",
-					"webhook_dispatched": webhook_dispatched
-				}, indent=2, ensure_ascii=False),
-				status=HTTPStatus.ACCEPTED,
-				mimetype='application/json'
-			)
+			if _COUNSELOR_WEBHOOK_URL:
+				webhook_dispatched = submit_webhook(_dispatch_counselor_webhook, payload)
+
+			return _json_response({
+				"message": "Notification received",
+				"webhook_dispatched": webhook_dispatched
+			}, HTTPStatus.ACCEPTED, pretty=False)
 		except Exception as exc:
 			return jsonify({"error": str(exc)}), HTTPStatus.INTERNAL_SERVER_ERROR
 
 	# =======================================================
 	# SPA Fallback - MUST BE LAST (catches all unmatched routes)
 	# =======================================================
-	from flask import send_from_directory
-
 	@app.route("/", defaults={"path": ""})
 	@app.route("/<path:path>")
 	def serve_frontend(path):
@@ -1,26 +1,40 @@
 import os
+import threading
 from typing import Optional
 from dotenv import load_dotenv
 from supabase import create_client, Client
+from supabase.lib.client_options import ClientOptions
 
 
 load_dotenv()
 
 _supabase: Optional[Client] = None
+_supabase_lock = threading.Lock()
 
 def get_supabase() -> Client:
 	global _supabase
 	if _supabase is None:
-		url = os.getenv("SUPABASE_URL")
-		# Prefer a single SUPABASE_KEY if provided; otherwise fall back to service/anon
-		key = (
-			os.getenv("SUPABASE_KEY")
-			or os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-			or os.getenv("SUPABASE_ANON_KEY")
-		)
-		if not url or not key:
-			raise RuntimeError(
-				"Supabase credentials are not configured. Set SUPABASE_URL and SUPABASE_KEY."
-			)
-		_supabase = create_client(url, key)
+		# Concurrent first requests (threaded server, io pool) must share one
+		# client so they share its keep-alive connection pool
+		with _supabase_lock:
+			if _supabase is None:
+				url = os.getenv("SUPABASE_URL")
+				# Prefer a single SUPABASE_KEY if provided; otherwise fall back to service/anon
+				key = (
+					os.getenv("SUPABASE_KEY")
+					or os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+					or os.getenv("SUPABASE_ANON_KEY")
+				)
+				if not url or not key:
+					raise RuntimeError(
+						"Supabase credentials are not configured. Set SUPABASE_URL and SUPABASE_KEY."
+					)
+				# Server-side client: no user session to persist or refresh, and a
+				# bounded PostgREST timeout so a stalled query can't pin a worker
+				options = ClientOptions(
+					postgrest_client_timeout=float(os.getenv("SUPABASE_POSTGREST_TIMEOUT", "30")),
+					auto_refresh_token=False,
+					persist_session=False,
+				)
+				_supabase = create_client(url, key, options=options)
 	return _supabase
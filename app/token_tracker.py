@@ -5,8 +5,15 @@ Tracks token usage for AI agent calls and manages user token balances.
 """
 
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from postgrest.exceptions import APIError
 from .supabase_client import get_supabase
+from .concurrency import run_in_parallel
+from .cache import token_balance_cache
+
+
+# PostgREST / Postgres codes for "RPC function not deployed"
+_MISSING_FUNCTION_CODES = {"PGRST202", "42883"}
 
 
 def extract_crewai_tokens(crew_result) -> Dict[str, int]:
@@ -40,46 +47,33 @@ def extract_crewai_tokens(crew_result) -> Dict[str, int]:
     return tokens
 
 
-def update_user_tokens(user_profile_id: int, tokens_used: int, endpoint: str) -> Dict[str, Any]:
+def update_user_tokens(user_profile_id: int, tokens_used: int, endpoint: str,
+                       idempotency_key: Optional[str] = None) -> Dict[str, Any]:
     """
     Atomically update user token balance and log usage.
+    A repeated idempotency_key is not charged twice.
     Returns updated balance and usage record.
     """
     supabase = get_supabase()
 
     try:
-        # Get current balance
-        profile = supabase.table("user_profile").select("token_balance").eq("id", user_profile_id).execute()
-        current_balance = profile.data[0].get("token_balance", 0) if profile.data else 0
-
-        # Handle None balance
-        if current_balance is None:
-            current_balance = 0
-
-        # Calculate new balance
-        new_balance = max(0, current_balance - tokens_used)  # Prevent negative
+        balances = _adjust_token_balance(supabase, user_profile_id, -tokens_used, endpoint, "openai", idempotency_key)
 
-        # Update balance atomically
-        supabase.table("user_profile").update({
-            "token_balance": new_balance
-        }).eq("id", user_profile_id).execute()
-
-        # Log usage (non-blocking - don't fail if logging fails)
-        try:
-            supabase.table("user_token_usage").insert({
-                "user_profile_id": user_profile_id,
-                "endpoint": endpoint,
-                "api_provider": "openai",
+        if not balances:
+            return {
                 "tokens_used": tokens_used,
-                "created_at": datetime.now().isoformat()
-            }).execute()
-        except Exception as log_error:
-            print(f"Warning: Failed to log token usage: {log_error}")
+                "remaining_tokens": None,
+                "success": False,
+                "error": f"User profile {user_profile_id} not found",
+                "not_found": True
+            }
 
         return {
             "tokens_used": tokens_used,
-            "previous_balance": current_balance,
-            "remaining_tokens": new_balance,
+            "previous_balance": balances["previous_balance"],
+            "remaining_tokens": balances["new_balance"],
+            "duplicate": balances.get("duplicate", False),
+            "idempotency_key": idempotency_key,
             "success": True
         }
     except Exception as e:
@@ -92,48 +86,130 @@ def update_user_tokens(user_profile_id: int, tokens_used: int, endpoint: str) ->
         }
 
 
+def _adjust_token_balance(supabase, user_profile_id: int, delta: int, endpoint: str, api_provider: str,
+                          idempotency_key: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Apply a token delta (negative to spend, positive to credit) and log it.
+
+    Uses the adjust_token_balance RPC, which locks the profile row so
+    concurrent writers cannot lose updates. Falls back to direct table
+    queries if the function has not been deployed yet.
+    Returns previous/new balance and a duplicate flag (set when
+    idempotency_key was already applied), or None if the user profile
+    doesn't exist.
+    """
+    try:
+        balances = supabase.rpc("adjust_token_balance", {
+            "p_user_profile_id": user_profile_id,
+            "p_delta": delta,
+            "p_endpoint": endpoint,
+            "p_api_provider": api_provider,
+            "p_idempotency_key": idempotency_key
+        }).execute().data
+    except APIError as rpc_error:
+        # Only fall back when the function is missing; timeouts, lock or constraint
+        # errors must not silently downgrade to the non-atomic read-modify-write
+        if rpc_error.code not in _MISSING_FUNCTION_CODES:
+            raise
+        print(f"Warning: adjust_token_balance RPC not available, using direct queries: {rpc_error}")
+        balances = _adjust_token_balance_direct(supabase, user_profile_id, delta, endpoint, api_provider, idempotency_key)
+
+    token_balance_cache.pop(user_profile_id)
+    return balances
+
+
+def _adjust_token_balance_direct(supabase, user_profile_id: int, delta: int, endpoint: str, api_provider: str,
+                                 idempotency_key: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Read-modify-write fallback for _adjust_token_balance (not atomic)."""
+    profile = supabase.table("user_profile").select("token_balance").eq("id", user_profile_id).maybe_single().execute()
+    if not profile:
+        return None
+
+    current_balance = profile.data.get("token_balance") or 0
+
+    if idempotency_key:
+        seen = supabase.table("user_token_usage").select("id") \
+            .eq("user_profile_id", user_profile_id) \
+            .eq("idempotency_key", idempotency_key) \
+            .limit(1).execute()
+        if seen.data:
+            return {
+                "previous_balance": current_balance,
+                "new_balance": current_balance,
+                "duplicate": True
+            }
+    new_balance = max(0, current_balance + delta)  # Prevent negative
+
+    supabase.table("user_profile").update({
+        "token_balance": new_balance
+    }).eq("id", user_profile_id).execute()
+
+    # Log usage (non-blocking - don't fail if logging fails)
+    usage_row = {
+        "user_profile_id": user_profile_id,
+        "endpoint": endpoint,
+        "api_provider": api_provider,
+        "tokens_used": -delta,  # Negative for additions
+        "created_at": datetime.now().isoformat()
+    }
+    if idempotency_key:
+        usage_row["idempotency_key"] = idempotency_key
+    try:
+        supabase.table("user_token_usage").insert(usage_row).execute()
+    except Exception as log_error:
+        print(f"Warning: Failed to log token usage: {log_error}")
+
+    return {
+        "previous_balance": current_balance,
+        "new_balance": new_balance,
+        "duplicate": False
+    }
+
+
 def get_user_token_balance(user_profile_id: int) -> Dict[str, Any]:
     """
     Get user's current token balance and usage history.
+
+    Uses the get_user_token_summary RPC so balance, total usage and recent
+    history come back in a single round-trip. Falls back to direct table
+    queries if the function has not been deployed yet. Successful results
+    are cached briefly and invalidated whenever the balance changes.
     """
+    cached = token_balance_cache.get(user_profile_id)
+    if cached is not None:
+        return cached
+
+    result = _fetch_user_token_balance(user_profile_id)
+    if result.get("success"):
+        token_balance_cache.set(user_profile_id, result)
+    return result
+
+
+def _fetch_user_token_balance(user_profile_id: int) -> Dict[str, Any]:
     supabase = get_supabase()
 
     try:
-        # Get current balance
-        profile = supabase.table("user_profile").select("token_balance").eq("id", user_profile_id).execute()
-
-        if not profile.data:
+        try:
+            summary = supabase.rpc("get_user_token_summary", {
+                "p_user_profile_id": user_profile_id
+            }).execute().data
+        except APIError as rpc_error:
+            print(f"Warning: get_user_token_summary RPC failed, using direct queries: {rpc_error}")
+            return _get_user_token_balance_direct(supabase, user_profile_id)
+
+        if not summary:
             return {
                 "success": False,
-                "error": f"User profile {user_profile_id} not found"
+                "error": f"User profile {user_profile_id} not found",
+                "not_found": True
             }
 
-        current_balance = profile.data[0].get("token_balance", 0)
-        if current_balance is None:
-            current_balance = 0
-
-        # Get recent usage history (last 10 entries)
-        usage_resp = supabase.table("user_token_usage") \
-            .select("*") \
-            .eq("user_profile_id", user_profile_id) \
-            .order("created_at", desc=True) \
-            .limit(10) \
-            .execute()
-
-        # Calculate total tokens used
-        total_usage_resp = supabase.table("user_token_usage") \
-            .select("tokens_used") \
-            .eq("user_profile_id", user_profile_id) \
-            .execute()
-
-        total_used = sum(r.get("tokens_used", 0) for r in total_usage_resp.data) if total_usage_resp.data else 0
-
         return {
             "success": True,
             "user_profile_id": user_profile_id,
-            "token_balance": current_balance,
-            "total_tokens_used": total_used,
-            "recent_usage": usage_resp.data if usage_resp.data else []
+            "token_balance": summary.get("token_balance") or 0,
+            "total_tokens_used": summary.get("total_tokens_used") or 0,
+            "recent_usage": summary.get("recent_usage") or []
         }
     except Exception as e:
         return {
@@ -142,50 +218,73 @@ def get_user_token_balance(user_profile_id: int) -> Dict[str, Any]:
         }
 
 
-def add_tokens_to_user(user_profile_id: int, tokens_to_add: int, reason: str = "manual_add") -> Dict[str, Any]:
+def _get_user_token_balance_direct(supabase, user_profile_id: int) -> Dict[str, Any]:
+    """
+    Build the token balance response from individual table queries.
+    The three lookups are independent, so they run concurrently.
+    """
+    profile, usage_resp, total_usage_resp = run_in_parallel(
+        # Current balance
+        lambda: supabase.table("user_profile").select("token_balance").eq("id", user_profile_id).maybe_single().execute(),
+        # Recent usage history (last 10 entries)
+        lambda: supabase.table("user_token_usage")
+            .select("*")
+            .eq("user_profile_id", user_profile_id)
+            .order("created_at", desc=True)
+            .limit(10)
+            .execute(),
+        # All usage rows for the total
+        lambda: supabase.table("user_token_usage")
+            .select("tokens_used")
+            .eq("user_profile_id", user_profile_id)
+            .execute()
+    )
+
+    if not profile:
+        return {
+            "success": False,
+            "error": f"User profile {user_profile_id} not found",
+            "not_found": True
+        }
+
+    current_balance = profile.data.get("token_balance") or 0
+
+    total_used = sum(r.get("tokens_used", 0) for r in total_usage_resp.data) if total_usage_resp.data else 0
+
+    return {
+        "success": True,
+        "user_profile_id": user_profile_id,
+        "token_balance": current_balance,
+        "total_tokens_used": total_used,
+        "recent_usage": usage_resp.data if usage_resp.data else []
+    }
+
+
+def add_tokens_to_user(user_profile_id: int, tokens_to_add: int, reason: str = "manual_add",
+                       idempotency_key: Optional[str] = None) -> Dict[str, Any]:
     """
     Add tokens to user's balance (for purchases, bonuses, etc.)
+    A repeated idempotency_key is not credited twice.
     """
     supabase = get_supabase()
 
     try:
-        # Get current balance
-        profile = supabase.table("user_profile").select("token_balance").eq("id", user_profile_id).execute()
+        balances = _adjust_token_balance(supabase, user_profile_id, tokens_to_add, reason, "system", idempotency_key)
 
-        if not profile.data:
+        if not balances:
             return {
                 "success": False,
-                "error": f"User profile {user_profile_id} not found"
+                "error": f"User profile {user_profile_id} not found",
+                "not_found": True
             }
 
-        current_balance = profile.data[0].get("token_balance", 0)
-        if current_balance is None:
-            current_balance = 0
-
-        new_balance = current_balance + tokens_to_add
-
-        # Update balance
-        supabase.table("user_profile").update({
-            "token_balance": new_balance
-        }).eq("id", user_profile_id).execute()
-
-        # Log the addition
-        try:
-            supabase.table("user_token_usage").insert({
-                "user_profile_id": user_profile_id,
-                "endpoint": reason,
-                "api_provider": "system",
-                "tokens_used": -tokens_to_add,  # Negative to indicate addition
-                "created_at": datetime.now().isoformat()
-            }).execute()
-        except Exception as log_error:
-            print(f"Warning: Failed to log token addition: {log_error}")
-
         return {
             "success": True,
             "tokens_added": tokens_to_add,
-            "previous_balance": current_balance,
-            "new_balance": new_balance
+            "previous_balance": balances["previous_balance"],
+            "new_balance": balances["new_balance"],
+            "duplicate": balances.get("duplicate", False),
+            "idempotency_key": idempotency_key
         }
     except Exception as e:
         return {
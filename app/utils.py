@@ -1,8 +1,23 @@
 """
 This file contains the utility functions for the routes
-like visa report, html report, and visa changes detection.
+like visa report, html report, visa changes detection and
+JSON extraction from agent output.
 """
 
+import json
+import re
+
+_json_decoder = json.JSONDecoder()
+
+# Marks "previous row not supplied" for _detect_visa_changes (None means "no previous row")
+_FETCH_PREVIOUS = object()
+
+# Keyword checks for the visa checklist, compiled once (case-insensitive, one pass per string)
+_HIGH_PRIORITY_DOC_RE = re.compile(r"passport|financial|medical", re.IGNORECASE)
+_FINANCIAL_PROOF_RE = re.compile(r"financial|bank", re.IGNORECASE)
+_MEDICAL_RE = re.compile(r"medical", re.IGNORECASE)
+_INTERVIEW_REQUIRED_VALUES = frozenset({"true", "required", "mandatory"})
+
 def _generate_visa_report(visa_data: dict, citizenship: str, destination: str) -> dict:
 	"""Generate user-facing visa checklist from structured data."""
 	
@@ -25,7 +40,7 @@ def _generate_visa_report(visa_data: dict, citizenship: str, destination: str) -
 				{
 					"item": doc,
 					"status": "pending",
-					"priority": "high" if any(keyword in doc.lower() for keyword in ["passport", "financial", "medical"]) else "medium"
+					"priority": "high" if _HIGH_PRIORITY_DOC_RE.search(doc) else "medium"
 				}
 				for doc in documents
 			]
@@ -47,11 +62,11 @@ def _generate_visa_report(visa_data: dict, citizenship: str, destination: str) -
 	
 	# Special conditions detection
 	special_conditions = []
-	if any("financial" in str(fees).lower() or "bank" in str(fees).lower() for fees in [fees]):
+	if _FINANCIAL_PROOF_RE.search(str(fees)):
 		special_conditions.append("Financial proof required")
-	if any("medical" in str(doc).lower() for doc in documents):
+	if any(_MEDICAL_RE.search(str(doc)) for doc in documents):
 		special_conditions.append("Medical examination required")
-	if interview and str(interview).lower() in ["true", "required", "mandatory"]:
+	if interview and str(interview).lower() in _INTERVIEW_REQUIRED_VALUES:
 		special_conditions.append("Interview required")
 	
 	report = {
@@ -147,17 +162,27 @@ def _generate_html_report(report: dict) -> str:
 	return html
 
 
-def _detect_visa_changes(supabase, citizenship: str, destination: str, user_profile_id: int, new_data: dict) -> dict:
-	"""Detect changes in visa requirements and return change summary."""
-	
-	# Get the most recent existing data
+def _fetch_latest_visa_row(supabase, citizenship: str, destination: str, user_profile_id: int) -> dict | None:
+	"""Return the most recently updated visa_requirements row for the pair, or None."""
 	existing_resp = supabase.table("visa_requirements").select("*") \
 		.eq("citizenship_country", citizenship) \
 		.eq("destination_country", destination) \
 		.eq("user_profile_id", user_profile_id) \
-		.order("last_updated", desc=True).limit(1).execute()
+		.order("last_updated", desc=True).limit(1).maybe_single().execute()
+	return existing_resp.data if existing_resp else None
+
+def _detect_visa_changes(supabase, citizenship: str, destination: str, user_profile_id: int, new_data: dict, prev_row=_FETCH_PREVIOUS) -> dict:
+	"""
+	Detect changes in visa requirements and return change summary.
+	Pass `prev_row` (a row or None) when the caller already fetched the most
+	recent existing row, to skip the lookup query.
+	"""
 	
-	if not existing_resp.data:
+	# Get the most recent existing data
+	if prev_row is _FETCH_PREVIOUS:
+		prev_row = _fetch_latest_visa_row(supabase, citizenship, destination, user_profile_id)
+	
+	if not prev_row:
 		# No existing data, this is new
 		return {
 			"has_changes": False,
@@ -166,7 +191,7 @@ def _detect_visa_changes(supabase, citizenship: str, destination: str, user_prof
 			"alert_needed": False
 		}
 	
-	existing_data = existing_resp.data[0]
+	existing_data = prev_row
 	changes = []
 	
 	# Compare key fields
@@ -194,3 +219,68 @@ def _detect_visa_changes(supabase, citizenship: str, destination: str, user_prof
 		"alert_needed": alert_needed,
 		"previous_version_id": existing_data.get("id")
 	}
+
+_JSON_OPENERS = re.compile(r"[\[{]")
+
+def _skip_json_value(text: str, idx: int) -> int:
+	"""
+	Return the index just past the bracketed value opening at `idx`, matching
+	brackets outside of string literals. Returns -1 if it is never closed.
+	"""
+	depth = 0
+	in_string = False
+	escaped = False
+	for pos in range(idx, len(text)):
+		char = text[pos]
+		if in_string:
+			if escaped:
+				escaped = False
+			elif char == "\\":
+				escaped = True
+			elif char == '"':
+				in_string = False
+		elif char == '"':
+			in_string = True
+		elif char in "[{":
+			depth += 1
+		elif char in "]}":
+			depth -= 1
+			if depth == 0:
+				return pos + 1
+	return -1
+
+def _extract_json(text: str, opener: str = "[", expected_type: type = list, item_type: type = None):
+	"""
+	Extract the first top-level JSON value starting with `opener` ('[' or '{')
+	from free-form agent output. Each top-level '[' or '{' is decoded in place
+	with raw_decode and skipped as a whole if it doesn't match, so arrays or
+	objects nested inside another value (or inside a malformed one) are never
+	returned on their own.
+	If `item_type` is given, a list only matches when every element is of
+	that type (so e.g. "[10]" in prose is skipped).
+	When looking for a list, a top-level object with a single key wrapping a
+	matching list (e.g. {"universities": [...]}) yields that list.
+	Returns the parsed value, or None if nothing of `expected_type` is found.
+	"""
+	def matches(value) -> bool:
+		return isinstance(value, expected_type) and (
+			item_type is None or all(isinstance(item, item_type) for item in value)
+		)
+
+	match = _JSON_OPENERS.search(text)
+	while match:
+		idx = match.start()
+		try:
+			value, end = _json_decoder.raw_decode(text, idx)
+			if text[idx] == opener and matches(value):
+				return value
+			if opener == "[" and isinstance(value, dict) and len(value) == 1:
+				(wrapped,) = value.values()
+				if isinstance(wrapped, list) and matches(wrapped):
+					return wrapped
+		except ValueError:
+			end = _skip_json_value(text, idx)
+			if end == -1:
+				return None
+		match = _JSON_OPENERS.search(text, end)
+	return None
@@ -22,6 +22,9 @@ from typing import List, Dict, Any
 # Add the app directory to the path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
 
+# Shared keep-alive session for the refresh calls made in each check loop
+_http_session = requests.Session()
+
 def get_supabase():
     """Get Supabase client."""
     from supabase_client import get_supabase
@@ -61,7 +64,7 @@ def check_visa_changes_for_user(user_profile_id: int, supabase) -> Dict[str, Any
                 "refresh": "true"
             }
             
-            response = requests.get(refresh_url, params=params, timeout=30)
+            response = _http_session.get(refresh_url, params=params, timeout=30)
             if response.status_code == 200:
                 data = response.json()
                 if data.get("agent_refresh_attempted"):
@@ -105,7 +108,7 @@ def check_visa_changes_for_pair(citizenship: str, destination: str, supabase) ->
                 "refresh": "true"
             }
             
-            response = requests.get(refresh_url, params=params, timeout=30)
+            response = _http_session.get(refresh_url, params=params, timeout=30)
             if response.status_code == 200:
                 data = response.json()
                 if data.get("agent_refresh_attempted"):
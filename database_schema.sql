@@ -207,6 +207,14 @@ create table if not exists public.visa_requirements (
 create index if not exists idx_visa_req_cit_dest on public.visa_requirements (citizenship_country, destination_country);
 create index if not exists idx_visa_req_type on public.visa_requirements (visa_type);
 create index if not exists idx_visa_req_user on public.visa_requirements (user_profile_id);
+-- Latest rows for a user's citizenship/destination pair (visa_info, visa_report, change detection)
+-- come straight off this index instead of filter + sort
+create index if not exists idx_visa_req_user_pair_updated
+    on public.visa_requirements (user_profile_id, citizenship_country, destination_country, last_updated desc);
+-- Pending alerts per user, newest first (visa_alerts); only unsent rows are indexed
+create index if not exists idx_visa_req_user_pending_alerts
+    on public.visa_requirements (user_profile_id, last_updated desc)
+    where alert_sent = false;
 
 -- Enable RLS + temporary open policy
 alter table public.visa_requirements enable row level security;
@@ -261,6 +269,19 @@ ADD COLUMN user_profile_id INT REFERENCES public.user_profile(id) ON DELETE CASC
 CREATE INDEX IF NOT EXISTS idx_application_requirements_user_freshness
     ON public.application_requirements (user_profile_id, fetched_at);
 
+-- One checklist per user/university/program; lets the API store agent results with
+-- a single upsert (on_conflict). Drop older duplicate rows first, keeping the
+-- latest fetched_at (then highest id) per key.
+DELETE FROM public.application_requirements a
+USING public.application_requirements b
+WHERE a.user_profile_id = b.user_profile_id
+  AND a.university = b.university
+  AND a.program = b.program
+  AND (a.fetched_at, a.id) < (b.fetched_at, b.id);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_application_requirements_user_program
+    ON public.application_requirements (user_profile_id, university, program);
+
 -- ===========================
 -- ADMISSIONS COUNSELLOR AGENT
 -- ===========================
@@ -282,6 +303,14 @@ CREATE TABLE IF NOT EXISTS public.admissions_summary (
 
 -- Useful indices
 CREATE INDEX IF NOT EXISTS idx_admissions_summary_user ON public.admissions_summary (user_id);
+-- One summary row per user, so the API can upsert on user_id.
+-- Drop older duplicate rows first, keeping the latest (then highest id) per user.
+DELETE FROM public.admissions_summary a
+USING public.admissions_summary b
+WHERE a.user_id = b.user_id
+  AND (a.last_updated, a.id) < (b.last_updated, b.id);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_admissions_summary_user_unique ON public.admissions_summary (user_id);
 
 -- Enable RLS + temporary open policy
 ALTER TABLE public.admissions_summary ENABLE ROW LEVEL SECURITY;
@@ -341,9 +370,158 @@ CREATE TABLE IF NOT EXISTS public.user_token_usage (
 CREATE INDEX IF NOT EXISTS idx_user_token_usage_user ON public.user_token_usage (user_profile_id);
 CREATE INDEX IF NOT EXISTS idx_user_token_usage_created ON public.user_token_usage (created_at DESC);
 
+-- Optional client-supplied key so retried balance changes are applied once
+ALTER TABLE public.user_token_usage
+ADD COLUMN IF NOT EXISTS idempotency_key TEXT;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_user_token_usage_idempotency
+    ON public.user_token_usage (user_profile_id, idempotency_key)
+    WHERE idempotency_key IS NOT NULL;
+
 -- Enable RLS + temporary open policy
 ALTER TABLE public.user_token_usage ENABLE ROW LEVEL SECURITY;
 CREATE POLICY "Allow all on user_token_usage"
     ON public.user_token_usage
     FOR ALL
     USING (TRUE);
+
+-- Token summary in a single round-trip (balance + total usage + last 10 entries)
+-- Returns NULL when the user profile does not exist
+CREATE OR REPLACE FUNCTION public.get_user_token_summary(p_user_profile_id INT)
+RETURNS JSON
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT json_build_object(
+        'token_balance', COALESCE(up.token_balance, 0),
+        'total_tokens_used', COALESCE((
+            SELECT SUM(tu.tokens_used)
+            FROM public.user_token_usage tu
+            WHERE tu.user_profile_id = up.id
+        ), 0),
+        'recent_usage', COALESCE((
+            SELECT json_agg(recent)
+            FROM (
+                SELECT *
+                FROM public.user_token_usage tu
+                WHERE tu.user_profile_id = up.id
+                ORDER BY tu.created_at DESC
+                LIMIT 10
+            ) recent
+        ), '[]'::json)
+    )
+    FROM public.user_profile up
+    WHERE up.id = p_user_profile_id;
+$$;
+
+-- Atomically apply a token delta (positive = credit, negative = spend) and log it
+-- Locks the profile row so concurrent credits/debits cannot lose updates.
+-- Balance never drops below zero. Returns NULL when the user profile does not exist.
+-- A repeated p_idempotency_key is not re-applied; the current balance is returned with duplicate = true.
+CREATE OR REPLACE FUNCTION public.adjust_token_balance(
+    p_user_profile_id INT,
+    p_delta INT,
+    p_endpoint TEXT,
+    p_api_provider TEXT DEFAULT 'openai',
+    p_idempotency_key TEXT DEFAULT NULL
+)
+RETURNS JSON
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_previous INT;
+    v_new INT;
+BEGIN
+    SELECT COALESCE(token_balance, 0) INTO v_previous
+    FROM public.user_profile
+    WHERE id = p_user_profile_id
+    FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RETURN NULL;
+    END IF;
+
+    IF p_idempotency_key IS NOT NULL AND EXISTS (
+        SELECT 1 FROM public.user_token_usage
+        WHERE user_profile_id = p_user_profile_id
+          AND idempotency_key = p_idempotency_key
+    ) THEN
+        RETURN json_build_object('previous_balance', v_previous, 'new_balance', v_previous, 'duplicate', TRUE);
+    END IF;
+
+    v_new := GREATEST(0, v_previous + p_delta);
+
+    UPDATE public.user_profile
+    SET token_balance = v_new
+    WHERE id = p_user_profile_id;
+
+    INSERT INTO public.user_token_usage (user_profile_id, endpoint, api_provider, tokens_used, idempotency_key)
+    VALUES (p_user_profile_id, p_endpoint, p_api_provider, -p_delta, p_idempotency_key);
+
+    RETURN json_build_object('previous_balance', v_previous, 'new_balance', v_new, 'duplicate', FALSE);
+END;
+$$;
+
+-- Start a university search in one round-trip: snapshot the profile server-side and log the request
+-- Returns {search_id, profile}, or NULL when the user profile does not exist.
+CREATE OR REPLACE FUNCTION public.begin_university_search(
+    p_user_profile_id INT,
+    p_payload JSONB DEFAULT '{}'::jsonb
+)
+RETURNS JSON
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_profile JSONB;
+    v_search_id INT;
+BEGIN
+    SELECT to_jsonb(up.*) INTO v_profile
+    FROM public.user_profile up
+    WHERE up.id = p_user_profile_id;
+
+    IF v_profile IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    INSERT INTO public.search_requests (user_profile_id, request_payload)
+    VALUES (
+        p_user_profile_id,
+        COALESCE(p_payload, '{}'::jsonb) || jsonb_build_object(
+            'profile_snapshot', jsonb_build_object('timestamp', now(), 'profile', v_profile),
+            'request_timestamp', now()
+        )
+    )
+    RETURNING id INTO v_search_id;
+
+    RETURN json_build_object('search_id', v_search_id, 'profile', v_profile);
+END;
+$$;
+
+-- Admissions summary overview in one round-trip: per-table counts plus the profile name
+-- p_today is passed by the API so "upcoming scholarships" uses the same date as the rest of the request
+CREATE OR REPLACE FUNCTION public.get_user_admissions_counts(
+    p_user_profile_id INT,
+    p_today DATE DEFAULT CURRENT_DATE
+)
+RETURNS JSON
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT json_build_object(
+        'universities_found', (
+            SELECT COUNT(*) FROM public.university_results WHERE user_profile_id = p_user_profile_id
+        ),
+        'scholarships_found', (
+            SELECT COUNT(*) FROM public.scholarship_results
+            WHERE user_profile_id = p_user_profile_id AND deadline >= p_today
+        ),
+        'application_requirements', (
+            SELECT COUNT(*) FROM public.application_requirements WHERE user_profile_id = p_user_profile_id
+        ),
+        'visa_info_count', (
+            SELECT COUNT(*) FROM public.visa_requirements WHERE user_profile_id = p_user_profile_id
+        ),
+        'profile_name', (
+            SELECT full_name FROM public.user_profile WHERE id = p_user_profile_id
+        )
+    );
+$$;
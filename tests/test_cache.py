@@ -0,0 +1,57 @@
+"""
+Unit tests for the in-process TTL cache.
+
+Tests cover:
+- Basic get/set/pop behaviour
+- Expiry after the TTL elapses
+- LRU eviction when the cache is full
+"""
+
+import sys
+import os
+from unittest.mock import patch
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.cache import TTLCache
+
+
+class TestTTLCache:
+    """Test suite for TTLCache."""
+
+    def test_get_set_and_pop(self):
+        """Stored values are returned until popped."""
+        cache = TTLCache(maxsize=10, ttl=60)
+        assert cache.get(1) is None
+        assert cache.get(1, "default") == "default"
+
+        cache.set(1, {"token_balance": 100})
+        assert cache.get(1) == {"token_balance": 100}
+
+        assert cache.pop(1) == {"token_balance": 100}
+        assert cache.get(1) is None
+        assert cache.pop(1) is None
+
+    def test_entries_expire_after_ttl(self):
+        """Entries are dropped once their TTL has elapsed."""
+        cache = TTLCache(maxsize=10, ttl=5)
+        with patch("app.cache.time.monotonic", return_value=1000.0):
+            cache.set("user", True)
+        with patch("app.cache.time.monotonic", return_value=1004.9):
+            assert cache.get("user") is True
+        with patch("app.cache.time.monotonic", return_value=1005.0):
+            assert cache.get("user") is None
+        assert len(cache) == 0
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """When full, the least recently accessed entry is evicted first."""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
@@ -0,0 +1,63 @@
+"""
+Unit tests for the concurrency helpers.
+
+Tests cover:
+- Ordered results from run_in_parallel
+- Fire-and-forget logging through the dedicated log worker
+- Dropping (and counting) log tasks when the queue is full
+- Outbound webhooks on their own worker
+"""
+
+import sys
+import os
+import queue
+import threading
+from unittest.mock import patch
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import concurrency
+from app.concurrency import run_in_parallel, submit_log, dropped_log_count, submit_webhook
+
+
+class TestConcurrency:
+    """Test suite for the concurrency helpers."""
+
+    def test_run_in_parallel_preserves_order(self):
+        """Results come back in argument order."""
+        assert run_in_parallel(lambda: 1, lambda: 2, lambda: 3) == [1, 2, 3]
+
+    def test_submit_log_runs_on_log_worker(self):
+        """Queued log tasks run on the dedicated log worker thread."""
+        done = threading.Event()
+        seen = {}
+
+        def task(value):
+            seen["value"] = value
+            seen["thread"] = threading.current_thread().name
+            done.set()
+
+        assert submit_log(task, 42) is True
+        assert done.wait(timeout=5)
+        assert seen == {"value": 42, "thread": "log-worker"}
+
+    def test_submit_log_drops_when_queue_full(self):
+        """A full queue drops the task and bumps the drop counter."""
+        before = dropped_log_count()
+        with patch.object(concurrency._log_worker.queue, "put_nowait", side_effect=queue.Full):
+            assert submit_log(lambda: None) is False
+        assert dropped_log_count() == before + 1
+
+    def test_submit_webhook_runs_on_webhook_worker(self):
+        """Webhook calls run on their own worker, not the I/O pool."""
+        done = threading.Event()
+        seen = {}
+
+        def task():
+            seen["thread"] = threading.current_thread().name
+            done.set()
+
+        assert submit_webhook(task) is True
+        assert done.wait(timeout=5)
+        assert seen == {"thread": "webhook-worker"}
@@ -0,0 +1,82 @@
+"""
+Unit tests for route utility helpers.
+
+Tests cover:
+- JSON extraction from free-form agent output
+- Visa change detection against a pre-fetched row
+"""
+
+import sys
+import os
+from unittest.mock import MagicMock
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.utils import _extract_json, _detect_visa_changes
+
+
+class TestExtractJson:
+    """Test suite for _extract_json."""
+
+    def test_extracts_array_from_markdown_fence(self):
+        """Arrays wrapped in prose and code fences are decoded."""
+        output = 'Here are the results:\n```json\n[{"name": "MIT", "programs": ["CS"]}]\n```\nDone.'
+        assert _extract_json(output) == [{"name": "MIT", "programs": ["CS"]}]
+
+    def test_skips_arrays_with_wrong_item_type(self):
+        """Bracketed prose that isn't a list of objects is skipped."""
+        output = 'Found [2] matches: [{"name": "A"}, {"name": "B"}]'
+        assert _extract_json(output, "[", list, item_type=dict) == [{"name": "A"}, {"name": "B"}]
+
+    def test_extracts_object(self):
+        """Objects are decoded and trailing text is ignored."""
+        output = 'Result: {"visa_type": "F-1", "fees": {"sevis": 350}} -- end'
+        assert _extract_json(output, "{", dict) == {"visa_type": "F-1", "fees": {"sevis": 350}}
+
+    def test_ignores_lists_nested_in_an_object(self):
+        """A list of objects inside a single object is not returned as the array."""
+        output = 'Result: {"visa_type": "F-1", "documents": [{"name": "Passport"}]}'
+        assert _extract_json(output, "[", list, item_type=dict) is None
+        assert _extract_json(output, "{", dict)["visa_type"] == "F-1"
+
+    def test_unwraps_single_key_object_around_array(self):
+        """A list of objects wrapped in a one-key object is returned as the array."""
+        output = 'Result: {"universities": [{"name": "A"}]}'
+        assert _extract_json(output, "[", list, item_type=dict) == [{"name": "A"}]
+
+    def test_ignores_lists_nested_in_a_malformed_array(self):
+        """A malformed outer array does not fall through to its nested arrays."""
+        output = '[{"name": "MIT", "programs": [{"name": "CS"}]},]'
+        assert _extract_json(output, "[", list, item_type=dict) is None
+
+    def test_returns_none_without_valid_json(self):
+        """Missing or malformed JSON yields None."""
+        assert _extract_json("no json here") is None
+        assert _extract_json('[{"name": "A",') is None
+
+
+class TestDetectVisaChanges:
+    """Test suite for _detect_visa_changes."""
+
+    def test_prefetched_row_skips_lookup(self):
+        """A supplied prev_row is compared directly without querying Supabase."""
+        supabase = MagicMock()
+        prev_row = {"id": 7, "visa_type": "F-1", "fees": {"sevis": 350}}
+
+        result = _detect_visa_changes(supabase, "India", "USA", 1, {"visa_type": "F-1", "fees": {"sevis": 400}}, prev_row=prev_row)
+
+        supabase.table.assert_not_called()
+        assert result["alert_needed"] is True
+        assert result["previous_version_id"] == 7
+        assert [c["field"] for c in result["changes"]] == ["fees"]
+
+    def test_prefetched_none_means_new(self):
+        """prev_row=None marks the record as new without querying Supabase."""
+        supabase = MagicMock()
+
+        result = _detect_visa_changes(supabase, "India", "USA", 1, {"visa_type": "F-1"}, prev_row=None)
+
+        supabase.table.assert_not_called()
+        assert result["is_new"] is True
+        assert result["alert_needed"] is False